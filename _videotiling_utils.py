@@ -0,0 +1,74 @@
+"""
+Shared helpers for the video processing scripts.
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+# Default source folder for videos
+SRC_FOLDER = Path('src')
+
+# Hardware H.264 encoders, with settings of roughly libx264 -crf 23 quality
+HW_ENCODER_ARGS = {
+    'h264_nvenc': ['-c:v', 'h264_nvenc', '-preset', 'p5', '-rc', 'vbr', '-cq', '23', '-b:v', '0'],
+    'h264_qsv': ['-c:v', 'h264_qsv', '-preset', 'medium', '-global_quality', '23'],
+    'h264_videotoolbox': ['-c:v', 'h264_videotoolbox', '-q:v', '65'],
+}
+
+# Consumer NVIDIA cards only allow a few simultaneous NVENC sessions
+NVENC_MAX_SESSIONS = 2
+
+def available_cpus():
+    """Number of CPUs this process may run on (respects affinity/cgroup cpusets)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def resolve_folder_path(folder_input):
+    """Resolve folder path, prepending src/ if it's a relative name."""
+    folder_path = Path(folder_input)
+
+    # If it's an absolute path or starts with ./ or ../, use as-is
+    if folder_path.is_absolute() or str(folder_input).startswith(('./', '../')):
+        return folder_path
+
+    # Otherwise, check if it exists in src/ folder (one stat per candidate)
+    src_path = SRC_FOLDER / folder_input
+    try:
+        os.stat(src_path)
+        return src_path
+    except (OSError, ValueError):
+        pass
+
+    # Original path exists, use it
+    try:
+        os.stat(folder_path)
+        return folder_path
+    except (OSError, ValueError):
+        # If neither exists, return the src path (will show error later)
+        return src_path
+
+def detect_hw_encoder():
+    """Find a working hardware H.264 encoder, or None to use libx264.
+
+    An encoder being listed by ffmpeg doesn't mean the hardware is there, so
+    each candidate is checked with a tiny test encode.
+    """
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+    for encoder in HW_ENCODER_ARGS:
+        if encoder not in result.stdout:
+            continue
+        test_cmd = [
+            'ffmpeg', '-hide_banner', '-v', 'error',
+            '-f', 'lavfi', '-i', 'color=black:s=256x256:d=0.1',
+            *HW_ENCODER_ARGS[encoder],
+            '-f', 'null', '-'
+        ]
+        if subprocess.run(test_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0:
+            return encoder
+    return None
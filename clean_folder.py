@@ -7,82 +7,332 @@ Remove duplicate videos and/or rename files by modification date.
 import os
 import sys
 import argparse
+import enum
 import hashlib
+import mmap
+import multiprocessing
+import sqlite3
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Default source folder for videos
-SRC_FOLDER = Path('src')
+from _videotiling_utils import SRC_FOLDER, available_cpus, resolve_folder_path
+
+# BLAKE3 is much faster than MD5 on large files; fall back to MD5 if not installed
+try:
+    import blake3
+    HASH_ALGORITHM = 'blake3'
+except ImportError:
+    blake3 = None
+    HASH_ALGORITHM = 'md5'
 
 # Common video file extensions
-VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm'}
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm'})
 
-def resolve_folder_path(folder_input):
-    """Resolve folder path, prepending src/ if it's a relative name."""
-    folder_path = Path(folder_input)
+# Lower- and upper-case forms, so most suffixes match without calling lower()
+VIDEO_EXTENSIONS_CI = frozenset(e for ext in VIDEO_EXTENSIONS for e in (ext, ext.upper()))
 
-    # If it's an absolute path or starts with ./ or ../, use as-is
-    if folder_path.is_absolute() or str(folder_input).startswith(('./', '../')):
-        return folder_path
+class Mode(enum.IntEnum):
+    """Operation modes (values match the -m/--mode choices)."""
+    DUPLICATES = 1
+    RENAME = 2
+    BOTH = 3
 
-    # Otherwise, check if it exists in src/ folder
-    src_path = SRC_FOLDER / folder_input
-    if src_path.exists():
-        return src_path
+MODE_NAMES = {
+    Mode.DUPLICATES: 'Remove duplicates',
+    Mode.RENAME: 'Rename by date',
+    Mode.BOTH: 'Both'
+}
 
-    # If neither exists, return the src path (will show error later)
-    if not folder_path.exists():
-        return src_path
+# Hash cache (persists across runs so unmodified files aren't rehashed)
+HASH_CACHE_FILE = Path.home() / '.cache' / 'video-tiling' / 'hashes.sqlite'
 
-    # Original path exists, use it
-    return folder_path
+# Default number of files hashed in parallel
+DEFAULT_HASH_THREADS = min(8, available_cpus())
 
-def get_video_files(folder_path):
-    """Get all video files in the specified folder, sorted alphabetically."""
+# Minimum seconds between progress line updates
+PROGRESS_INTERVAL = 0.1
+
+# Files at least this large are compared by head+tail before a full hash
+PARTIAL_HASH_MIN_SIZE = 100 * 1024 * 1024
+PARTIAL_HASH_EDGE = 1024 * 1024
+
+class HashCache:
+    """SQLite-backed cache of file hashes keyed on (path, size, mtime).
+
+    Each hash algorithm gets its own tables so switching between MD5 and
+    BLAKE3 never returns a hash from the other algorithm. Full-file and
+    head+tail (partial) hashes are stored in separate tables.
+
+    Every write commits straight away, so the database is never locked for
+    longer than one insert. Database errors count as cache misses: the cache
+    can make hashing slower, never wrong.
+    """
+
+    def __init__(self, db_path=HASH_CACHE_FILE, algorithm=HASH_ALGORITHM):
+        self.conn = None
+        self.tables = {False: f'{algorithm}_hashes', True: f'{algorithm}_partial_hashes'}
+        self.lock = threading.Lock()  # Shared by hashing threads
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit: no transaction stays open between hashes
+            self.conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+            try:
+                # --jobs workers share the database; in WAL mode their lookups
+                # don't wait on each other's inserts
+                self.conn.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.Error:
+                pass  # Keep the default journal (e.g. the database is busy right now)
+            for table in self.tables.values():
+                self.conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS {table} '
+                    '(path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT(64))'
+                )
+        except (OSError, sqlite3.Error) as e:
+            print(f"  Warning: Could not open hash cache: {e}")
+            self.close()
+
+    def get(self, path, size, mtime_ns, partial=False):
+        """Return the cached hash, or None if missing, stale or unreadable."""
+        try:
+            with self.lock:
+                if self.conn is None:
+                    return None
+                row = self.conn.execute(
+                    f'SELECT hash FROM {self.tables[partial]} WHERE path=? AND size=? AND mtime_ns=?',
+                    (path, size, mtime_ns)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def set(self, path, size, mtime_ns, file_hash, partial=False):
+        """Store a hash for the given file state (skipped if the database is unavailable)."""
+        try:
+            with self.lock:
+                if self.conn is None:
+                    return
+                self.conn.execute(
+                    f'INSERT OR REPLACE INTO {self.tables[partial]} (path, size, mtime_ns, hash) VALUES (?, ?, ?, ?)',
+                    (path, size, mtime_ns, file_hash)
+                )
+        except sqlite3.Error as e:
+            # Stop writing rather than waiting on a busy database for every file
+            print(f"  Warning: Could not save to hash cache, continuing without it: {e}")
+            self.close()
+
+    def close(self):
+        """Close the database."""
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.close()
+            self.conn = None
+
+def is_video_extension(ext):
+    """Check a file extension (including the dot) against VIDEO_EXTENSIONS."""
+    return ext in VIDEO_EXTENSIONS_CI or ext.lower() in VIDEO_EXTENSIONS
+
+def scan_video_files(folder_path):
+    """Get (path, stat) for all video files in a folder, sorted alphabetically.
+
+    Uses os.scandir so the file-type check comes from the directory listing
+    and each video is stat'ed exactly once.
+    """
     folder = Path(folder_path)
     if not folder.exists():
         print(f"Error: Folder '{folder_path}' does not exist.")
         return []
 
-    video_files = [f for f in folder.iterdir()
-                   if f.is_file() and f.suffix.lower() in VIDEO_EXTENSIONS]
-    return sorted(video_files, key=lambda x: x.name.lower())
+    with os.scandir(folder) as entries:
+        video_files = [(folder / entry.name, entry.stat()) for entry in entries
+                       if entry.is_file() and is_video_extension(os.path.splitext(entry.name)[1])]
+    return sorted(video_files, key=lambda x: x[0].name.lower())
+
+def get_video_files(folder_path):
+    """Get all video files in the specified folder, sorted alphabetically."""
+    return [f for f, _ in scan_video_files(folder_path)]
+
+def fadvise(f, advice):
+    """Give the kernel a page-cache hint for an open file (no-op if unsupported)."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, getattr(os, advice))
+        except OSError:
+            pass
+
+def compute_file_hash(file_path, chunk_size=1 << 20, cache=None, stat=None):
+    """Compute BLAKE3 (or MD5) hash of a file, using the hash cache when available."""
+    try:
+        if cache is not None:
+            stat = stat or file_path.stat()
+            cache_key = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+            cached = cache.get(*cache_key)
+            if cached:
+                return cached
+
+        with open(file_path, 'rb') as f:
+            # Ask for aggressive readahead while hashing, then drop the pages
+            # so hashing a large folder doesn't evict everything else cached
+            fadvise(f, 'POSIX_FADV_SEQUENTIAL')
+            try:
+                if blake3 is not None:
+                    # update_mmap releases the GIL and hashes with multiple threads
+                    hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                    hasher.update_mmap(str(file_path))
+                elif hasattr(hashlib, 'file_digest'):
+                    # Python 3.11+: C-level read loop with no per-chunk allocations
+                    hasher = hashlib.file_digest(f, 'md5')
+                else:
+                    hasher = hashlib.md5()
+                    try:
+                        # Hash straight from the page cache, no per-chunk copies
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            hasher.update(mm)
+                    except ValueError:
+                        # Empty files can't be mapped
+                        while chunk := f.read(chunk_size):
+                            hasher.update(chunk)
+            finally:
+                fadvise(f, 'POSIX_FADV_DONTNEED')
+        file_hash = hasher.hexdigest()
+
+        if cache is not None:
+            cache.set(*cache_key, file_hash)
+        return file_hash
+    except Exception as e:
+        print(f"  Warning: Could not hash {file_path.name}: {e}")
+        return None
 
-def compute_file_hash(file_path, chunk_size=8192):
-    """Compute MD5 hash of a file."""
-    hasher = hashlib.md5()
+def compute_partial_hash(file_path, size, edge=PARTIAL_HASH_EDGE, cache=None, stat=None):
+    """Hash only the first and last `edge` bytes of a file."""
     try:
+        if cache is not None:
+            stat = stat or file_path.stat()
+            cache_key = (str(file_path.resolve()), size, stat.st_mtime_ns)
+            cached = cache.get(*cache_key, partial=True)
+            if cached:
+                return cached
+
+        hasher = blake3.blake3() if blake3 is not None else hashlib.md5()
         with open(file_path, 'rb') as f:
-            while chunk := f.read(chunk_size):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+            hasher.update(f.read(edge))
+            f.seek(max(size - edge, 0))
+            hasher.update(f.read(edge))
+        file_hash = hasher.hexdigest()
+
+        if cache is not None:
+            cache.set(*cache_key, file_hash, partial=True)
+        return file_hash
     except Exception as e:
         print(f"  Warning: Could not hash {file_path.name}: {e}")
         return None
 
-def find_duplicates(video_files):
-    """Find duplicate videos by content hash."""
+def hash_files(files, hash_func, hash_threads, label='Hashing'):
+    """Hash files in parallel, showing progress. Returns {file: hash}."""
+    hashes = {}
+    last_update = 0
+
+    with ThreadPoolExecutor(max_workers=hash_threads) as executor:
+        futures = {executor.submit(hash_func, vf): vf for vf in files}
+
+        for i, future in enumerate(as_completed(futures), 1):
+            video_file = futures[future]
+
+            # Throttle progress output - terminal writes add up on big folders
+            now = time.monotonic()
+            if now - last_update >= PROGRESS_INTERVAL or i == len(files):
+                print(f"  {label}: {video_file.name} ({i}/{len(files)})", end='\r')
+                last_update = now
+
+            file_hash = future.result()
+            if file_hash:
+                hashes[video_file] = file_hash
+
+    if files:
+        print()  # New line after progress
+
+    return hashes
+
+def find_duplicates(video_files, hash_threads=DEFAULT_HASH_THREADS, file_stats=None):
+    """Find duplicate videos by content hash, hashing files in parallel.
+
+    file_stats optionally maps each file to its stat result (as returned by
+    scan_video_files) so files aren't stat'ed again. Files within each
+    duplicate group keep their order from video_files.
+    """
     print("\nScanning for duplicates...")
 
-    hash_to_files = defaultdict(list)
+    if file_stats is None:
+        file_stats = {f: f.stat() for f in video_files}
+
+    # Group by size first - files with a unique size can't have duplicates
+    file_sizes = {}
+    size_groups = defaultdict(list)
+    for video_file in video_files:
+        file_sizes[video_file] = file_stats[video_file].st_size
+        size_groups[file_sizes[video_file]].append(video_file)
+
+    size_groups = {size: files for size, files in size_groups.items() if len(files) > 1}
+
+    num_shared_size = sum(len(files) for files in size_groups.values())
+    print(f"  Skipped hashing {len(video_files) - num_shared_size}/{len(video_files)} unique-size file(s)")
 
-    for i, video_file in enumerate(video_files, 1):
-        print(f"  Hashing: {video_file.name} ({i}/{len(video_files)})", end='\r')
-        file_hash = compute_file_hash(video_file)
-        if file_hash:
-            hash_to_files[file_hash].append(video_file)
+    # Common case: every size is unique, so there's nothing to open or hash
+    if not size_groups:
+        return {}
 
-    print()  # New line after progress
+    cache = HashCache()
+
+    try:
+        # Large files of the same size almost always differ in their header
+        # or trailing index, so compare head+tail before reading everything
+        large_files = [f for size, files in size_groups.items()
+                       if size >= PARTIAL_HASH_MIN_SIZE for f in files]
+        partial_hashes = hash_files(
+            large_files,
+            lambda vf: compute_partial_hash(vf, file_sizes[vf], cache=cache, stat=file_stats[vf]),
+            hash_threads, 'Quick hashing'
+        )
+
+        candidate_groups = defaultdict(list)
+        for size, files in size_groups.items():
+            for video_file in files:
+                if size < PARTIAL_HASH_MIN_SIZE:
+                    candidate_groups[size].append(video_file)
+                elif video_file in partial_hashes:
+                    candidate_groups[(size, partial_hashes[video_file])].append(video_file)
+
+        candidates = [f for files in candidate_groups.values() if len(files) > 1 for f in files]
+        if large_files:
+            num_pruned = num_shared_size - len(candidates)
+            print(f"  Skipped full hash for {num_pruned} file(s) with a unique head/tail")
+
+        full_hashes = hash_files(
+            candidates,
+            lambda vf: compute_file_hash(vf, cache=cache, stat=file_stats[vf]),
+            hash_threads
+        )
+    finally:
+        cache.close()
+
+    hash_to_files = defaultdict(list)  # hex digest -> files
+    for video_file in candidates:
+        if video_file in full_hashes:
+            hash_to_files[full_hashes[video_file]].append(video_file)
 
     # Find groups with duplicates
     duplicates = {h: files for h, files in hash_to_files.items() if len(files) > 1}
 
     return duplicates
 
-def remove_duplicates(folder_path):
+def remove_duplicates(folder_path, hash_threads=DEFAULT_HASH_THREADS):
     """Find and remove duplicate videos, keeping first alphabetically."""
-    video_files = get_video_files(folder_path)
+    file_stats = dict(scan_video_files(folder_path))
+    video_files = list(file_stats)
 
     if not video_files:
         print(f"No video files found in '{folder_path}'")
@@ -90,7 +340,7 @@ def remove_duplicates(folder_path):
 
     print(f"\nProcessing {len(video_files)} video(s) in '{folder_path}'")
 
-    duplicates = find_duplicates(video_files)
+    duplicates = find_duplicates(video_files, hash_threads, file_stats)
 
     if not duplicates:
         print("\n✓ No duplicates found")
@@ -103,17 +353,16 @@ def remove_duplicates(folder_path):
     print(f"\nFound {len(duplicates)} group(s) of duplicates:\n")
 
     for i, (file_hash, files) in enumerate(duplicates.items(), 1):
-        # Sort alphabetically to determine which to keep
-        sorted_files = sorted(files, key=lambda x: x.name.lower())
-        keep_file = sorted_files[0]
-        remove_files = sorted_files[1:]
+        # Groups are already in alphabetical order (from scan_video_files)
+        keep_file = files[0]
+        remove_files = files[1:]
 
         print(f"Group {i}:")
         print(f"  Keeping: {keep_file.name}")
         print(f"  Removing:")
 
         for dup_file in remove_files:
-            file_size = dup_file.stat().st_size
+            file_size = file_stats[dup_file].st_size
             try:
                 dup_file.unlink()
                 print(f"    ✓ {dup_file.name} ({file_size / 1024 / 1024:.2f} MB)")
@@ -130,9 +379,28 @@ def remove_duplicates(folder_path):
 
     return total_removed
 
+def rename_no_overwrite(src, dst):
+    """Rename src to dst, raising FileExistsError if dst already exists.
+
+    Hard-linking then unlinking fails atomically when dst exists, so there
+    is no separate exists() check that could race with other processes.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        raise
+    except OSError:
+        # Filesystem without hard links (e.g. exFAT) - check, then rename
+        if os.path.lexists(dst):
+            raise FileExistsError(f"'{dst}' already exists")
+        os.rename(src, dst)
+        return
+    os.unlink(src)
+
 def rename_by_date(folder_path, add_number=False):
     """Rename video files based on last modified date."""
-    video_files = get_video_files(folder_path)
+    video_entries = scan_video_files(folder_path)
+    video_files = [f for f, _ in video_entries]
 
     if not video_files:
         print(f"No video files found in '{folder_path}'")
@@ -150,9 +418,9 @@ def rename_by_date(folder_path, add_number=False):
     # Calculate number of digits needed for numbering
     num_digits = len(str(len(video_files)))
 
-    for i, video_file in enumerate(video_files, 1):
+    for i, (video_file, stat) in enumerate(video_entries, 1):
         # Get last modified time
-        mtime = video_file.stat().st_mtime
+        mtime = stat.st_mtime
         dt = datetime.fromtimestamp(mtime)
 
         # Format: 2024-01-15_14-30-45
@@ -167,25 +435,27 @@ def rename_by_date(folder_path, add_number=False):
 
         new_path = video_file.parent / new_name
 
-        # Handle conflicts - add counter if file exists
+        # Handle conflicts - add counter if the rename target is taken
         counter = 1
-        while new_path.exists() and new_path != video_file:
-            new_name = f"{date_str}_{counter:02d}{video_file.suffix}"
-            new_path = video_file.parent / new_name
-            counter += 1
-
-        # Skip if name is already correct
-        if new_path == video_file:
-            print(f"  ⊘ {video_file.name} (already named correctly)")
-            skipped_count += 1
-            continue
+        while True:
+            # Skip if name is already correct
+            if new_path == video_file:
+                print(f"  ⊘ {video_file.name} (already named correctly)")
+                skipped_count += 1
+                break
 
-        try:
-            video_file.rename(new_path)
-            print(f"  ✓ {video_file.name} → {new_name}")
-            renamed_count += 1
-        except Exception as e:
-            print(f"  ✗ {video_file.name} - Error: {e}")
+            try:
+                rename_no_overwrite(video_file, new_path)
+                print(f"  ✓ {video_file.name} → {new_name}")
+                renamed_count += 1
+                break
+            except FileExistsError:
+                new_name = f"{date_str}_{counter:02d}{video_file.suffix}"
+                new_path = video_file.parent / new_name
+                counter += 1
+            except Exception as e:
+                print(f"  ✗ {video_file.name} - Error: {e}")
+                break
 
     print(f"\n{'='*60}")
     print(f"Renamed {renamed_count} file(s)")
@@ -205,27 +475,30 @@ def get_operation_mode():
     while True:
         choice = input("\nSelect operation (1-3): ").strip()
         if choice in ['1', '2', '3']:
-            return choice
+            return Mode(int(choice))
         print("Invalid choice. Please enter 1, 2, or 3.")
 
-def process_folder(folder_path, operation_mode, add_number=False):
+def clean_both(folder_path, add_number=False, hash_threads=DEFAULT_HASH_THREADS):
+    """Remove duplicates, then rename the remaining files."""
+    removed = remove_duplicates(folder_path, hash_threads)
+    if removed > 0:
+        print("\nNow renaming remaining files...\n")
+    rename_by_date(folder_path, add_number)
+
+# Operation for each mode, called as func(folder_path, add_number, hash_threads)
+MODE_OPERATIONS = {
+    Mode.DUPLICATES: lambda folder_path, add_number, hash_threads: remove_duplicates(folder_path, hash_threads),
+    Mode.RENAME: lambda folder_path, add_number, hash_threads: rename_by_date(folder_path, add_number),
+    Mode.BOTH: clean_both
+}
+
+def process_folder(folder_path, mode, add_number=False, hash_threads=DEFAULT_HASH_THREADS):
     """Process a folder based on operation mode."""
     print(f"\n{'='*60}")
     print(f"Processing: {folder_path}")
     print('='*60)
 
-    if operation_mode == '1':
-        # Duplicates only
-        remove_duplicates(folder_path)
-    elif operation_mode == '2':
-        # Rename only
-        rename_by_date(folder_path, add_number)
-    elif operation_mode == '3':
-        # Both
-        removed = remove_duplicates(folder_path)
-        if removed > 0:
-            print("\nNow renaming remaining files...\n")
-        rename_by_date(folder_path, add_number)
+    MODE_OPERATIONS[mode](folder_path, add_number, hash_threads)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -247,13 +520,23 @@ Note: Folder names without '/' are looked up in 'src/' first
 
     parser.add_argument('folders', nargs='+',
                         help='One or more folders to clean')
-    parser.add_argument('-m', '--mode', choices=['1', '2', '3'],
-                        help='Operation mode: 1=duplicates, 2=rename, 3=both (skips prompt)')
+    parser.add_argument('-m', '--mode', type=int, choices=[m.value for m in Mode],
+                        help='Operation mode: 1=duplicates, 2=rename, 3=both (skips prompt, '
+                             'required when stdin is not a terminal)')
     parser.add_argument('-n', '--number', action='store_true',
                         help='Add sequential number prefix when renaming (001_, 002_, etc.)')
+    parser.add_argument('--hash-threads', type=int, default=DEFAULT_HASH_THREADS,
+                        help=f'Number of files to hash in parallel (default: {DEFAULT_HASH_THREADS})')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of folders to process in parallel (default: 1)')
 
     args = parser.parse_args()
 
+    if args.mode is None and not sys.stdin.isatty():
+        parser.error("--mode is required when stdin is not a terminal")
+    if args.hash_threads < 1:
+        parser.error("--hash-threads must be at least 1")
+
     print("=" * 60)
     print("Folder Cleaning Tool")
     print("=" * 60)
@@ -261,16 +544,21 @@ Note: Folder names without '/' are looked up in 'src/' first
 
     # Get operation mode
     if args.mode:
-        operation_mode = args.mode
-        mode_names = {'1': 'Remove duplicates', '2': 'Rename by date', '3': 'Both'}
-        print(f"Mode: {mode_names[operation_mode]}\n")
+        mode = Mode(args.mode)
+        print(f"Mode: {MODE_NAMES[mode]}\n")
     else:
-        operation_mode = get_operation_mode()
+        mode = get_operation_mode()
+
+    # Process each folder (folders are independent, so they can run in parallel)
+    folder_args = [(str(resolve_folder_path(folder)), mode, args.number, args.hash_threads)
+                   for folder in args.folders]
 
-    # Process each folder
-    for folder in args.folders:
-        resolved_folder = resolve_folder_path(folder)
-        process_folder(str(resolved_folder), operation_mode, args.number)
+    if args.jobs > 1 and len(folder_args) > 1:
+        with multiprocessing.Pool(min(args.jobs, len(folder_args))) as pool:
+            pool.starmap(process_folder, folder_args)
+    else:
+        for folder_arg in folder_args:
+            process_folder(*folder_arg)
 
     print(f"\n{'='*60}")
     print("All done!")
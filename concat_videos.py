@@ -7,35 +7,23 @@ Concatenates all videos in specified folders with custom transitions per folder.
 import os
 import sys
 import argparse
+import functools
+import json
+import multiprocessing
 import subprocess
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Default source folder for videos
-SRC_FOLDER = Path('src')
+from _videotiling_utils import SRC_FOLDER, available_cpus, resolve_folder_path
 
 # Common video file extensions
-VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm'}
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm'})
 
-def resolve_folder_path(folder_input):
-    """Resolve folder path, prepending src/ if it's a relative name."""
-    folder_path = Path(folder_input)
+# Lower- and upper-case forms, so most suffixes match without calling lower()
+VIDEO_EXTENSIONS_CI = frozenset(e for ext in VIDEO_EXTENSIONS for e in (ext, ext.upper()))
 
-    # If it's an absolute path or starts with ./ or ../, use as-is
-    if folder_path.is_absolute() or str(folder_input).startswith(('./', '../')):
-        return folder_path
-
-    # Otherwise, check if it exists in src/ folder
-    src_path = SRC_FOLDER / folder_input
-    if src_path.exists():
-        return src_path
-
-    # If neither exists, return the src path (will show error later)
-    if not folder_path.exists():
-        return src_path
-
-    # Original path exists, use it
-    return folder_path
+# Number of ffprobe processes to run at once
+PROBE_THREADS = available_cpus()
 
 # Transition types
 TRANSITIONS = {
@@ -50,39 +38,49 @@ TRANSITION_NAMES = {
     'fadeblack': 'Fade to Black (fade out/in through black)'
 }
 
+def is_video_extension(ext):
+    """Check a file extension (including the dot) against VIDEO_EXTENSIONS."""
+    return ext in VIDEO_EXTENSIONS_CI or ext.lower() in VIDEO_EXTENSIONS
+
 def get_video_files(folder_path):
     """Get all video files in the specified folder, sorted alphabetically."""
     folder = Path(folder_path)
-    if not folder.exists():
+
+    # scandir gets the file type from the directory listing - no stat per entry,
+    # and only matching entries become Path objects
+    try:
+        with os.scandir(folder) as entries:
+            video_files = [Path(entry.path) for entry in entries
+                           if is_video_extension(os.path.splitext(entry.name)[1]) and entry.is_file()]
+    except FileNotFoundError:
         print(f"Error: Folder '{folder_path}' does not exist.")
         return []
-
-    video_files = [f for f in folder.iterdir()
-                   if f.is_file() and f.suffix.lower() in VIDEO_EXTENSIONS]
     return sorted(video_files, key=lambda x: x.name.lower())
 
 def get_video_info(video_path):
-    """Get video duration and properties using ffprobe."""
+    """Get video duration and properties using ffprobe (cached per file)."""
+    return probe_video(str(Path(video_path).resolve()))
+
+@functools.lru_cache(maxsize=None)
+def probe_video(video_path):
+    """Run ffprobe once for a resolved video path."""
     try:
         cmd = [
             'ffprobe',
             '-v', 'error',
             '-select_streams', 'v:0',
             '-show_entries', 'stream=width,height,r_frame_rate:format=duration',
-            '-of', 'default=noprint_wrappers=1',
-            str(video_path)
+            '-of', 'json',
+            video_path
         ]
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
 
-        info = {}
-        for line in result.stdout.strip().split('\n'):
-            if '=' in line:
-                key, value = line.split('=', 1)
-                info[key] = value
+        probe = json.loads(result.stdout)
+        streams = probe.get('streams') or [{}]
 
-        duration = float(info.get('duration', 0))
-        width = int(info.get('width', 0))
-        height = int(info.get('height', 0))
+        duration = float(probe.get('format', {}).get('duration', 0))
+        width = int(streams[0].get('width', 0))
+        height = int(streams[0].get('height', 0))
 
         return {
             'duration': duration,
@@ -90,42 +88,48 @@ def get_video_info(video_path):
             'height': height
         }
     except (subprocess.CalledProcessError, ValueError, KeyError) as e:
-        print(f"Warning: Could not get info for {video_path.name}")
+        print(f"Warning: Could not get info for {Path(video_path).name}")
         return None
 
+def probe_videos(video_files):
+    """Get info for several videos, running ffprobe in parallel."""
+    with ThreadPoolExecutor(max_workers=PROBE_THREADS) as executor:
+        return list(executor.map(get_video_info, video_files))
+
 def concat_simple_cut(video_files, output_path):
     """Concatenate videos with simple cuts (no transitions) - fast, no re-encode."""
     print("Using simple cut (fast mode - no re-encoding)...")
 
-    # Create a temporary file list for ffmpeg concat demuxer
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-        concat_file = f.name
-        for video in video_files:
-            # Escape single quotes and wrap path in quotes
-            escaped_path = str(video.absolute()).replace("'", "'\\''")
-            f.write(f"file '{escaped_path}'\n")
+    # Build the concat demuxer file list and feed it to ffmpeg on stdin
+    concat_lines = []
+    for video in video_files:
+        # Escape single quotes and wrap path in quotes
+        escaped_path = str(video.absolute()).replace("'", "'\\''")
+        concat_lines.append(f"file '{escaped_path}'\n")
 
     try:
         cmd = [
             'ffmpeg',
             '-f', 'concat',
             '-safe', '0',
-            '-i', concat_file,
+            '-protocol_whitelist', 'file,pipe',
+            '-i', 'pipe:0',
             '-c', 'copy',
             '-y',
             str(output_path)
         ]
 
-        subprocess.run(cmd, check=True)
+        subprocess.run(cmd, input=''.join(concat_lines), text=True, check=True)
         return True
     except subprocess.CalledProcessError as e:
         print(f"Error during concatenation: {e}")
         return False
-    finally:
-        os.unlink(concat_file)
 
-def concat_with_transitions(video_files, output_path, transition_type, duration):
-    """Concatenate videos with transitions - requires re-encoding."""
+def concat_with_transitions(video_files, infos, output_path, transition_type, duration):
+    """Concatenate videos with transitions - requires re-encoding.
+
+    infos holds the get_video_info result for each video, in the same order.
+    """
     print(f"Using {TRANSITION_NAMES[transition_type]} with {duration}s transition...")
     print("Note: This requires re-encoding and may take a while...")
 
@@ -133,8 +137,8 @@ def concat_with_transitions(video_files, output_path, transition_type, duration)
         print("Note: Only one video found, copying without transitions...")
         return concat_simple_cut(video_files, output_path)
 
-    # Get video info to determine resolution
-    first_info = get_video_info(video_files[0])
+    # Use the first video's resolution for the output
+    first_info = infos[0]
     if not first_info:
         print("Error: Could not determine video properties")
         return False
@@ -143,9 +147,9 @@ def concat_with_transitions(video_files, output_path, transition_type, duration)
 
     # Build filter complex for transitions
     if transition_type == 'fade':
-        filter_complex = build_xfade_filter(video_files, duration, width, height)
+        filter_complex = build_xfade_filter(video_files, infos, duration, width, height)
     else:  # fadeblack
-        filter_complex = build_fadeblack_filter(video_files, duration, width, height)
+        filter_complex = build_fadeblack_filter(video_files, infos, duration, width, height)
 
     # Build ffmpeg command
     cmd = ['ffmpeg']
@@ -175,7 +179,7 @@ def concat_with_transitions(video_files, output_path, transition_type, duration)
         print(f"Error during concatenation: {e}")
         return False
 
-def build_xfade_filter(video_files, duration, width, height):
+def build_xfade_filter(video_files, infos, duration, width, height):
     """Build ffmpeg filter complex for cross-dissolve transitions."""
     num_videos = len(video_files)
 
@@ -185,10 +189,9 @@ def build_xfade_filter(video_files, duration, width, height):
         filter_parts.append(f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps=30[v{i}]")
         filter_parts.append(f"[{i}:a]aformat=sample_rates=48000:channel_layouts=stereo[a{i}]")
 
-    # Get durations and calculate offset times
+    # Calculate offset times from the probed durations
     offsets = [0]
-    for i, video in enumerate(video_files[:-1]):
-        info = get_video_info(video)
+    for info in infos[:-1]:
         if info:
             offsets.append(offsets[-1] + info['duration'] - duration)
 
@@ -208,7 +211,7 @@ def build_xfade_filter(video_files, duration, width, height):
 
     return ';'.join(filter_parts)
 
-def build_fadeblack_filter(video_files, duration, width, height):
+def build_fadeblack_filter(video_files, infos, duration, width, height):
     """Build ffmpeg filter complex for fade to black transitions."""
     num_videos = len(video_files)
     fade_time = duration / 2  # Half time for fade out, half for fade in
@@ -216,8 +219,7 @@ def build_fadeblack_filter(video_files, duration, width, height):
     filter_parts = []
     concat_inputs = []
 
-    for i, video in enumerate(video_files):
-        info = get_video_info(video)
+    for i, info in enumerate(infos):
         if not info:
             continue
 
@@ -301,8 +303,12 @@ def get_transition_settings(folder_path):
 
     return transition_type, duration
 
-def process_folder(folder_path, output_dir):
-    """Process all videos in a folder with specified transition settings."""
+def process_folder(folder_path, output_dir, verbose=False, transition_settings=None):
+    """Process all videos in a folder with specified transition settings.
+
+    transition_settings is a (transition_type, duration) tuple; when None
+    the user is prompted for them.
+    """
     video_files = get_video_files(folder_path)
 
     if not video_files:
@@ -324,14 +330,19 @@ def process_folder(folder_path, output_dir):
             print(f"✗ Error copying video: {e}")
         return
 
+    # Probe every video once up front; later lookups hit the cache
+    infos = probe_videos(video_files)
+
     print(f"\nFound {len(video_files)} video(s) in '{folder_path}'")
     print("Videos in order:")
-    for i, vf in enumerate(video_files, 1):
-        info = get_video_info(vf)
+    for i, (vf, info) in enumerate(zip(video_files, infos), 1):
         duration_str = f"{info['duration']:.2f}s" if info else "unknown"
         print(f"  {i}. {vf.name} ({duration_str})")
 
-    transition_type, duration = get_transition_settings(folder_path)
+    if transition_settings is None:
+        transition_type, duration = get_transition_settings(folder_path)
+    else:
+        transition_type, duration = transition_settings
 
     # Create output filename
     folder_name = Path(folder_path).name
@@ -343,11 +354,14 @@ def process_folder(folder_path, output_dir):
     if transition_type == 'cut':
         success = concat_simple_cut(video_files, output_path)
     else:
-        success = concat_with_transitions(video_files, output_path, transition_type, duration)
+        success = concat_with_transitions(video_files, infos, output_path, transition_type, duration)
 
     if success:
-        output_info = get_video_info(output_path)
-        duration_str = f" ({output_info['duration']:.2f}s)" if output_info else ""
+        duration_str = ""
+        if verbose:
+            # Probing the output is only needed to report its duration
+            output_info = get_video_info(output_path)
+            duration_str = f" ({output_info['duration']:.2f}s)" if output_info else ""
         print(f"\n✓ Successfully created: {output_path}{duration_str}")
     else:
         print(f"\n✗ Failed to create concatenated video")
@@ -369,6 +383,11 @@ Note: Requires ffmpeg to be installed.
     parser.add_argument('folders', nargs='+', help='One or more folders containing videos to concatenate')
     parser.add_argument('-o', '--output', default='concatenated_output',
                         help='Output directory for concatenated videos (default: concatenated_output)')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Probe each output file and report its duration')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of folders to encode in parallel (default: 1). '
+                             'Transition settings for all folders are asked up front.')
 
     args = parser.parse_args()
 
@@ -388,9 +407,22 @@ Note: Requires ffmpeg to be installed.
     print(f"Output directory: {output_dir.absolute()}")
     print(f"Note: Folder names without '/' are looked up in '{SRC_FOLDER}/' first\n")
 
-    for folder in args.folders:
-        resolved_folder = resolve_folder_path(folder)
-        process_folder(str(resolved_folder), output_dir)
+    resolved_folders = [str(resolve_folder_path(folder)) for folder in args.folders]
+
+    if args.jobs > 1 and len(resolved_folders) > 1:
+        # Ask for every folder's settings first, then encode folders in parallel
+        folder_args = []
+        for folder in resolved_folders:
+            transition_settings = None
+            if len(get_video_files(folder)) > 1:
+                transition_settings = get_transition_settings(folder)
+            folder_args.append((folder, output_dir, args.verbose, transition_settings))
+
+        with multiprocessing.Pool(min(args.jobs, len(folder_args))) as pool:
+            pool.starmap(process_folder, folder_args)
+    else:
+        for folder in resolved_folders:
+            process_folder(folder, output_dir, args.verbose)
 
     print(f"\n{'='*60}")
     print(f"All done! Concatenated videos saved to: {output_dir.absolute()}")
@@ -7,19 +7,38 @@ Automatically detects scene changes in videos and optionally splits them into se
 import os
 import sys
 import argparse
+import asyncio
+import bisect
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import multiprocessing
+import shutil
 import subprocess
+import tempfile
 from pathlib import Path
 
-# Default source folder for videos
-SRC_FOLDER = Path('src')
+from _videotiling_utils import SRC_FOLDER, available_cpus, resolve_folder_path
 
-# Common video file extensions
-VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm'}
+# Common video file extensions (a tuple so names can be checked with str.endswith)
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm')
+
+# Absolute paths to ffmpeg/ffprobe (None if not installed), resolved once
+FFMPEG_BIN = shutil.which('ffmpeg')
+FFPROBE_BIN = shutil.which('ffprobe')
+
+# Number of scene clips to cut at once (CPUs we're actually allowed to use)
+SPLIT_WORKERS = available_cpus()
+
+# Scene lists from earlier runs (re-used while the video and detector settings are unchanged)
+SCENE_CACHE_DIR = Path.home() / '.cache' / 'video-tiling' / 'scenes'
 
 def check_scenedetect():
     """Check if scenedetect is installed."""
     try:
-        from scenedetect import detect, ContentDetector
+        from scenedetect import open_video, SceneManager, ContentDetector
         return True
     except ImportError:
         return False
@@ -30,59 +49,192 @@ def check_venv():
     venv_path = script_dir / 'venv'
     return venv_path.exists() and (venv_path / 'bin' / 'activate').exists()
 
-def resolve_folder_path(folder_input):
-    """Resolve folder path, prepending src/ if it's a relative name."""
-    folder_path = Path(folder_input)
-
-    # If it's an absolute path or starts with ./ or ../, use as-is
-    if folder_path.is_absolute() or str(folder_input).startswith(('./', '../')):
-        return folder_path
-
-    # Otherwise, check if it exists in src/ folder
-    src_path = SRC_FOLDER / folder_input
-    if src_path.exists():
-        return src_path
-
-    # If neither exists, return the src path (will show error later)
-    if not folder_path.exists():
-        return src_path
-
-    # Original path exists, use it
-    return folder_path
-
 def get_video_files(folder_path):
     """Get all video files in the specified folder, sorted alphabetically."""
     folder = Path(folder_path)
-    if not folder.exists():
+
+    # scandir gets the file type from the directory listing - no stat per entry,
+    # and a missing folder shows up as an error instead of needing an exists() check
+    try:
+        with os.scandir(folder) as entries:
+            video_files = [Path(entry.path) for entry in entries
+                           if entry.name.lower().endswith(VIDEO_EXTENSIONS) and entry.is_file()]
+    except FileNotFoundError:
         print(f"Error: Folder '{folder_path}' does not exist.")
         return []
-
-    video_files = [f for f in folder.iterdir()
-                   if f.is_file() and f.suffix.lower() in VIDEO_EXTENSIONS]
     return sorted(video_files, key=lambda x: x.name.lower())
 
-def get_video_duration(video_path):
-    """Get the duration of a video in seconds using ffprobe."""
+# ffprobe results, keyed on (path, size, mtime) so changed files are re-probed
+_probe_cache = {}
+_keyframe_cache = {}
+
+def get_probe_cache_key(video_path):
+    """Return a (resolved_path, size, mtime_ns) key for a video, or None if it can't be stat'd."""
+    try:
+        stat = os.stat(video_path)
+        return (str(Path(video_path).resolve()), stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return None
+
+def probe_video(video_path):
+    """Get duration, video codec and frame rate with a single ffprobe call.
+
+    Returns {'duration': ..., 'video_codec': ..., 'framerate': ...}, or None on error.
+    """
+    cache_key = get_probe_cache_key(video_path)
+    if cache_key in _probe_cache:
+        return _probe_cache[cache_key]
+
+    try:
+        cmd = [
+            FFPROBE_BIN,
+            '-v', 'error',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            str(video_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        data = json.loads(result.stdout)
+        duration = float(data['format']['duration'])
+    except (subprocess.CalledProcessError, ValueError, KeyError):
+        return None
+
+    video_stream = next((stream for stream in data.get('streams', [])
+                         if stream.get('codec_type') == 'video'), {})
+    framerate = None
+    if '/' in video_stream.get('avg_frame_rate', ''):
+        num, den = video_stream['avg_frame_rate'].split('/')
+        if float(den):
+            framerate = float(num) / float(den)
+
+    info = {
+        'duration': duration,
+        'video_codec': video_stream.get('codec_name'),
+        'framerate': framerate,
+    }
+    if cache_key:
+        _probe_cache[cache_key] = info
+    return info
+
+def get_keyframe_times(video_path):
+    """Get the sorted keyframe timestamps of the first video stream, or [] on error.
+
+    Only reads packet headers (no decoding), so it's much cheaper than a decode pass.
+    """
+    cache_key = get_probe_cache_key(video_path)
+    if cache_key in _keyframe_cache:
+        return _keyframe_cache[cache_key]
+
     try:
         cmd = [
-            'ffprobe',
+            FFPROBE_BIN,
             '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
+            '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags',
+            '-of', 'csv=p=0',
             str(video_path)
         ]
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
-    except (subprocess.CalledProcessError, ValueError):
+    except subprocess.CalledProcessError:
+        return []
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags:
+            try:
+                keyframes.append(float(pts_time))
+            except ValueError:
+                continue
+    keyframes.sort()
+
+    if cache_key:
+        _keyframe_cache[cache_key] = keyframes
+    return keyframes
+
+def snap_to_keyframes(scene_bounds, keyframes):
+    """Move scene boundaries back to the keyframe at or before them.
+
+    Stream copy can only start a clip on a keyframe, so snapping makes each
+    clip start where ffmpeg will actually cut and end where the next one
+    starts, instead of overlapping. Ends after the last keyframe and scenes
+    that would collapse to nothing are left as they are.
+    """
+    if not keyframes:
+        return scene_bounds
+
+    def snap(t):
+        index = bisect.bisect_right(keyframes, t + 1e-6) - 1
+        return keyframes[index] if index >= 0 else t
+
+    snapped = []
+    for start_sec, end_sec in scene_bounds:
+        new_start = snap(start_sec)
+        new_end = snap(end_sec) if end_sec < keyframes[-1] else end_sec
+        if new_end > new_start:
+            snapped.append((new_start, new_end))
+        else:
+            snapped.append((start_sec, end_sec))
+    return snapped
+
+def get_scene_cache_path(video_path, detector_type, threshold):
+    """Return the cache file for a video's scene list, or None if the video can't be stat'd."""
+    try:
+        stat = os.stat(video_path)
+    except OSError:
         return None
+    key_source = f"{Path(video_path).resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{detector_type}|{threshold}"
+    key = hashlib.blake2b(key_source.encode(), digest_size=16).hexdigest()
+    return SCENE_CACHE_DIR / f"{key}.json"
+
+def load_cached_scenes(cache_path):
+    """Load a cached scene list as (scene_list, duration), or None on a cache miss."""
+    from scenedetect import FrameTimecode
+
+    try:
+        with open(cache_path) as f:
+            data = json.load(f)
+        fps = data['fps']
+        scene_list = [(FrameTimecode(start, fps), FrameTimecode(end, fps))
+                      for start, end in data['scenes']]
+        return scene_list, data['duration']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def save_cached_scenes(cache_path, scene_list, fps, duration):
+    """Save a scene list (as frame numbers) so unchanged videos skip detection next time."""
+    data = {
+        'fps': fps,
+        'duration': duration,
+        'scenes': [(start.get_frames(), end.get_frames()) for start, end in scene_list],
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix('.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"  Warning: Could not save scene cache: {e}")
+
+def detect_scenes(video_path, detector_type='content', threshold=27.0, show_progress=True):
+    """Detect scenes in a video using PySceneDetect, re-using cached results when possible.
 
-def detect_scenes(video_path, detector_type='content', threshold=27.0):
-    """Detect scenes in a video using PySceneDetect."""
-    from scenedetect import detect, ContentDetector, AdaptiveDetector
+    Returns (scene_list, duration_in_seconds), or (None, None) on error.
+    """
+    from scenedetect import open_video, SceneManager, ContentDetector, AdaptiveDetector
 
     print(f"\n  Analyzing video: {video_path.name}")
     print(f"  Detector: {detector_type}, Threshold: {threshold}")
 
+    cache_path = get_scene_cache_path(video_path, detector_type, threshold)
+    if cache_path:
+        cached = load_cached_scenes(cache_path)
+        if cached:
+            print(f"  ✓ Using cached scene list (video unchanged since last run)")
+            return cached
+
     try:
         if detector_type == 'content':
             detector = ContentDetector(threshold=threshold)
@@ -91,60 +243,204 @@ def detect_scenes(video_path, detector_type='content', threshold=27.0):
         else:
             detector = ContentDetector(threshold=threshold)
 
-        scene_list = detect(str(video_path), detector, show_progress=True)
-        return scene_list
+        video = open_video(str(video_path))
+
+        # SceneManager already downscales frames (~256px wide) before
+        # detection by default, so no downscale setting is needed here
+        scene_manager = SceneManager()
+        scene_manager.add_detector(detector)
+        scene_manager.detect_scenes(video, show_progress=show_progress)
+
+        scene_list = scene_manager.get_scene_list()
+
+        # The opened video already knows its duration - no need for ffprobe
+        duration = video.duration.get_seconds() if video.duration else None
+
+        if cache_path:
+            save_cached_scenes(cache_path, scene_list, video.frame_rate, duration)
+        return scene_list, duration
 
     except Exception as e:
         print(f"  ✗ Error detecting scenes: {e}")
-        return None
+        return None, None
+
+def split_with_segment_muxer(video_path, scene_bounds, keyframes, output_path, video_name_prefix):
+    """Split a video at all scene boundaries with a single ffmpeg segment-muxer run.
+
+    Only works when the scenes cover the video back to back from the start
+    and every boundary sits on a distinct keyframe (see snap_to_keyframes),
+    so the muxer cuts exactly where the per-scene path would. Returns False
+    otherwise, or if ffmpeg didn't produce one file per scene, so the caller
+    can fall back to cutting scenes one by one.
+    scene_bounds is a list of (start_sec, end_sec) pairs.
+    """
+    # Scenes must start at 0 and each must begin where the previous one ended
+    if scene_bounds[0][0] > 0 or any(
+            abs(scene_bounds[i][1] - scene_bounds[i + 1][0]) > 1e-6
+            for i in range(len(scene_bounds) - 1)):
+        return False
 
-def split_video_into_scenes(video_path, scene_list, output_dir, video_name_prefix=None):
-    """Split video into individual scene clips using ffmpeg directly."""
-    if not scene_list:
-        print("  No scenes detected - video will not be split")
+    # The muxer moves each cut forward to the next keyframe, and two cuts in
+    # one GOP would shift every later scene - only cut on keyframes, in order
+    cut_times = [end_sec for _, end_sec in scene_bounds[:-1]]
+    keyframe_set = set(keyframes)
+    if any(t not in keyframe_set for t in cut_times) or any(
+            a >= b for a, b in zip(cut_times, cut_times[1:])):
         return False
 
-    if video_name_prefix is None:
-        video_name_prefix = video_path.stem
+    # Ask for a cut just before each keyframe so rounding can't push it to the next one
+    segment_times = ','.join(f"{max(t - 0.001, 0):.6f}" for t in cut_times)
 
-    print(f"\n  Splitting into {len(scene_list)} scene(s)...")
+    # Write into a scratch folder first so leftovers from earlier runs
+    # can't be mistaken for output of this one
+    with tempfile.TemporaryDirectory(dir=output_path) as temp_dir:
+        scene_pattern = Path(temp_dir) / f"{video_name_prefix}-Scene-%03d.mp4"
 
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            FFMPEG_BIN,
+            '-i', str(video_path),
+            '-c', 'copy',
+            '-f', 'segment',
+            '-reset_timestamps', '1',
+            '-segment_start_number', '1',
+        ]
+        if segment_times:
+            cmd.extend(['-segment_times', segment_times])
+        cmd.extend(['-y', str(scene_pattern)])
+
+        try:
+            # Nothing reads ffmpeg's log here, so don't pipe and buffer it
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        except subprocess.CalledProcessError:
+            return False
+
+        # Stream copy can only cut on keyframes; if two boundaries fell
+        # between the same keyframes we get fewer files than scenes
+        segments = sorted(Path(temp_dir).iterdir())
+        if len(segments) != len(scene_bounds):
+            return False
+
+        for segment in segments:
+            os.replace(segment, output_path / segment.name)
+
+    return True
+
+async def run_scene_jobs(jobs, total_scenes, split_workers=SPLIT_WORKERS):
+    """Run (scene_number, cmd, scene_filename) jobs, split_workers at a time.
 
+    jobs can be any iterable (e.g. a generator); it is consumed lazily through
+    a small queue, so only a few commands exist at any moment.
+    Returns the number of scenes that were created successfully.
+    """
+    queue = asyncio.Queue(maxsize=split_workers * 2)
+    done = 0
     success_count = 0
-    total_scenes = len(scene_list)
 
-    for i, (start_time, end_time) in enumerate(scene_list, 1):
+    async def run_job(i, cmd, scene_filename):
+        nonlocal done, success_count
+        stderr = b''
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            returncode = await proc.wait()
+
+            if returncode != 0:
+                # ffmpeg's output is discarded on the normal path; rerun
+                # once with stderr captured so the failure can be reported
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+                )
+                _, stderr = await proc.communicate()
+                returncode = proc.returncode
+        except OSError as e:
+            # e.g. too many open files or ffmpeg went missing - count the scene
+            # as failed and keep the worker alive so the job queue keeps draining
+            returncode = None
+            stderr = str(e).encode()
+
+        done += 1
+        if returncode == 0:
+            success_count += 1
+        else:
+            print(f"  ✗ Failed to create scene {i}: {scene_filename}")
+            error_lines = stderr.decode(errors='replace').strip().splitlines()
+            if error_lines:
+                print(f"    {error_lines[-1]}")
+
+        # Show progress
+        if done % 10 == 0 or done == total_scenes:
+            print(f"  Progress: {done}/{total_scenes} scenes...")
+
+    async def worker():
+        while (job := await queue.get()) is not None:
+            await run_job(*job)
+
+    workers = [asyncio.create_task(worker()) for _ in range(split_workers)]
+    for job in jobs:
+        await queue.put(job)
+    for _ in workers:
+        await queue.put(None)  # One stop marker per worker
+    await asyncio.gather(*workers)
+    return success_count
+
+def iter_scene_jobs(video_path, scene_bounds, output_path, video_name_prefix):
+    """Yield a (scene_number, cmd, scene_filename) ffmpeg job per scene."""
+    for i, (start_sec, end_sec) in enumerate(scene_bounds, 1):
         scene_filename = f"{video_name_prefix}-Scene-{i:03d}.mp4"
         scene_output = output_path / scene_filename
 
-        start_sec = start_time.get_seconds()
-        end_sec = end_time.get_seconds()
-
-        # Build ffmpeg command for this scene
+        # Build ffmpeg command for this scene - seeking before -i jumps
+        # straight to the start in the container index instead of reading
+        # through everything before it
         cmd = [
-            'ffmpeg',
-            '-i', str(video_path),
+            FFMPEG_BIN,
             '-ss', str(start_sec),
-            '-to', str(end_sec),
+            '-i', str(video_path),
+            '-t', str(end_sec - start_sec),
             '-c:v', 'copy',
             '-c:a', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+            '-threads', '1',  # Parallelism comes from running several at once
             '-y',
             str(scene_output)
         ]
+        yield i, cmd, scene_filename
 
-        try:
-            subprocess.run(cmd, capture_output=True, check=True)
-            success_count += 1
+def split_video_into_scenes(video_path, scene_list, output_dir, video_name_prefix=None,
+                            split_workers=SPLIT_WORKERS):
+    """Split video into individual scene clips using ffmpeg directly."""
+    if not scene_list:
+        print("  No scenes detected - video will not be split")
+        return False
 
-            # Show progress
-            if i % 10 == 0 or i == total_scenes:
-                print(f"  Progress: {i}/{total_scenes} scenes...")
+    if video_name_prefix is None:
+        video_name_prefix = video_path.stem
 
-        except subprocess.CalledProcessError as e:
-            print(f"  ✗ Failed to create scene {i}: {scene_filename}")
-            continue
+    print(f"\n  Splitting into {len(scene_list)} scene(s)...")
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    total_scenes = len(scene_list)
+
+    # FrameTimecode.get_seconds() divides by the frame rate each call, so convert once
+    scene_bounds = [(start.get_seconds(), end.get_seconds()) for start, end in scene_list]
+
+    # Stream copy cuts on keyframes anyway - align the boundaries with them
+    # so clip lengths match what ffmpeg produces and clips don't overlap
+    keyframes = get_keyframe_times(video_path)
+    scene_bounds = snap_to_keyframes(scene_bounds, keyframes)
+
+    # Fast path: cut every scene in one ffmpeg pass
+    if split_with_segment_muxer(video_path, scene_bounds, keyframes, output_path, video_name_prefix):
+        print(f"  ✓ Successfully created {total_scenes}/{total_scenes} scene file(s)")
+        return True
+
+    # Cut scenes in parallel - each ffmpeg reads the input independently,
+    # and commands are generated as workers become free
+    jobs = iter_scene_jobs(video_path, scene_bounds, output_path, video_name_prefix)
+    success_count = asyncio.run(run_scene_jobs(jobs, total_scenes, split_workers))
 
     if success_count == total_scenes:
         print(f"  ✓ Successfully created {success_count}/{total_scenes} scene file(s)")
@@ -158,10 +454,12 @@ def split_video_into_scenes(video_path, scene_list, output_dir, video_name_prefi
 
 def format_timecode(seconds):
     """Format seconds as HH:MM:SS.mmm"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+    # Work in integer milliseconds to avoid float modulo rounding (e.g. 59.9999 -> "60.000")
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{ms:03d}"
 
 def display_scene_info(scene_list, video_duration=None):
     """Display information about detected scenes."""
@@ -173,20 +471,31 @@ def display_scene_info(scene_list, video_duration=None):
     print(f"  {'Scene':<8} {'Start':<14} {'End':<14} {'Duration':<12}")
     print(f"  {'-'*50}")
 
-    for i, (start_time, end_time) in enumerate(scene_list, 1):
-        start_sec = start_time.get_seconds()
-        end_sec = end_time.get_seconds()
+    # Convert each timecode once and reuse for both the table and the statistics
+    scene_bounds = [(start.get_seconds(), end.get_seconds()) for start, end in scene_list]
+
+    # Build the whole table and print it at once - one write instead of one per scene
+    rows = []
+    for i, (start_sec, end_sec) in enumerate(scene_bounds, 1):
         duration = end_sec - start_sec
 
-        print(f"  {i:<8} {format_timecode(start_sec):<14} {format_timecode(end_sec):<14} {duration:>8.2f}s")
+        rows.append(f"  {i:<8} {format_timecode(start_sec):<14} {format_timecode(end_sec):<14} {duration:>8.2f}s")
+    print('\n'.join(rows))
 
-    # Calculate statistics
-    total_scene_time = sum((end.get_seconds() - start.get_seconds()) for start, end in scene_list)
-    avg_scene_duration = total_scene_time / len(scene_list) if scene_list else 0
+    # Calculate statistics (NumPy is always installed alongside PySceneDetect)
+    import numpy as np
+
+    durations = np.fromiter((end_sec - start_sec for start_sec, end_sec in scene_bounds),
+                            dtype=np.float64, count=len(scene_bounds))
+    avg_scene_duration = durations.mean()
+    median_scene_duration = np.median(durations)
+    p95_scene_duration = np.percentile(durations, 95)
 
     print(f"\n  Statistics:")
     print(f"    Total scenes: {len(scene_list)}")
     print(f"    Average scene duration: {avg_scene_duration:.2f}s")
+    print(f"    Median scene duration: {median_scene_duration:.2f}s")
+    print(f"    95th percentile scene duration: {p95_scene_duration:.2f}s")
     if video_duration:
         print(f"    Total video duration: {video_duration:.2f}s")
 
@@ -230,21 +539,24 @@ def get_detector_settings():
 
     return detector_type, threshold
 
-def process_video(video_path, detector_type, threshold, output_dir, split_mode='both'):
+def process_video(video_path, detector_type, threshold, output_dir, split_mode='both', show_progress=True,
+                  split_workers=SPLIT_WORKERS):
     """Process a single video: detect scenes and optionally split."""
     print(f"\n{'='*60}")
     print(f"Processing: {video_path.name}")
     print('='*60)
 
-    # Get video duration
-    duration = get_video_duration(video_path)
-
     # Detect scenes
-    scene_list = detect_scenes(video_path, detector_type, threshold)
+    scene_list, duration = detect_scenes(video_path, detector_type, threshold, show_progress)
 
     if scene_list is None:
         return False
 
+    # Fall back to ffprobe if the decoder couldn't report a duration
+    if not duration:
+        info = probe_video(video_path)
+        duration = info['duration'] if info else None
+
     # Display scene information
     display_scene_info(scene_list, duration)
 
@@ -254,7 +566,8 @@ def process_video(video_path, detector_type, threshold, output_dir, split_mode='
         video_output_dir = output_dir / video_path.stem
         video_output_dir.mkdir(parents=True, exist_ok=True)
 
-        success = split_video_into_scenes(video_path, scene_list, video_output_dir)
+        success = split_video_into_scenes(video_path, scene_list, video_output_dir,
+                                          split_workers=split_workers)
 
         if success:
             print(f"\n  ✓ Scenes saved to: {video_output_dir}")
@@ -268,6 +581,16 @@ def process_video(video_path, detector_type, threshold, output_dir, split_mode='
         print("\n  ℹ List-only mode - video not split")
         return True
 
+def process_video_buffered(video_path, **kwargs):
+    """Run process_video in a worker, capturing its output so logs don't interleave.
+
+    Returns (success, output).
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        success = process_video(video_path, show_progress=False, **kwargs)
+    return success, output.getvalue()
+
 def main():
     parser = argparse.ArgumentParser(
         description='Detect scenes in videos and optionally split them into clips.',
@@ -293,6 +616,8 @@ Note: Requires PySceneDetect to be installed.
                         help='Detection threshold (skips interactive prompt)')
     parser.add_argument('-m', '--method', choices=['content', 'adaptive'],
                         help='Detection method (skips interactive prompt)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of videos to process in parallel (default: 1)')
 
     args = parser.parse_args()
 
@@ -313,11 +638,8 @@ Note: Requires PySceneDetect to be installed.
             print("  pip install scenedetect")
         sys.exit(1)
 
-    # Check if ffmpeg is available
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        subprocess.run(['ffprobe', '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Check if ffmpeg is available (PATH lookup only, no need to run them)
+    if not FFMPEG_BIN or not FFPROBE_BIN:
         print("Error: ffmpeg and ffprobe must be installed.")
         print("Install with: brew install ffmpeg  (on macOS)")
         sys.exit(1)
@@ -348,17 +670,20 @@ Note: Requires PySceneDetect to be installed.
     for input_path in args.inputs:
         path = Path(input_path)
 
+        # is_file()/is_dir() are one stat each and are False for missing paths
+        is_file = path.is_file()
+
         # Try to resolve as folder first
-        if not path.exists() or not path.is_file():
+        if not is_file:
             resolved_path = resolve_folder_path(input_path)
-            if resolved_path.exists() and resolved_path.is_dir():
+            if resolved_path.is_dir():
                 # It's a folder
                 folder_videos = get_video_files(resolved_path)
                 videos_to_process.extend(folder_videos)
                 continue
 
         # Try as direct file path
-        if path.exists() and path.is_file() and path.suffix.lower() in VIDEO_EXTENSIONS:
+        if is_file and path.name.lower().endswith(VIDEO_EXTENSIONS):
             videos_to_process.append(path)
         else:
             print(f"Warning: '{input_path}' is not a valid video file or folder")
@@ -371,9 +696,26 @@ Note: Requires PySceneDetect to be installed.
 
     # Process each video
     success_count = 0
-    for video in videos_to_process:
-        if process_video(video, detector_type, threshold, output_dir, split_mode):
-            success_count += 1
+    if args.jobs > 1 and len(videos_to_process) > 1:
+        # Scene detection is CPU-bound, so run videos in separate processes
+        # and print each video's output once it finishes
+        pool_size = min(args.jobs, len(videos_to_process))
+
+        # Share the CPUs between the videos so parallel splits don't oversubscribe them
+        split_workers = max(1, SPLIT_WORKERS // pool_size)
+
+        worker = functools.partial(process_video_buffered, detector_type=detector_type,
+                                   threshold=threshold, output_dir=output_dir, split_mode=split_mode,
+                                   split_workers=split_workers)
+        with multiprocessing.Pool(pool_size) as pool:
+            for success, output in pool.imap_unordered(worker, videos_to_process):
+                print(output, end='')
+                if success:
+                    success_count += 1
+    else:
+        for video in videos_to_process:
+            if process_video(video, detector_type, threshold, output_dir, split_mode):
+                success_count += 1
 
     # Summary
     print(f"\n{'='*60}")
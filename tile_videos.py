@@ -8,19 +8,52 @@ Each tile can contain multiple videos from a folder (played sequentially).
 import os
 import sys
 import argparse
+import functools
+import hashlib
+import itertools
+import shutil
 import subprocess
 import tempfile
+import time
 import json
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from _videotiling_utils import (HW_ENCODER_ARGS, NVENC_MAX_SESSIONS, SRC_FOLDER, available_cpus, detect_hw_encoder,
+                                resolve_folder_path)
+
 # Common video file extensions
-VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm'}
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm'})
+
+# Lower- and upper-case forms, so most suffixes match without calling lower()
+VIDEO_EXTENSIONS_CI = frozenset(e for ext in VIDEO_EXTENSIONS for e in (ext, ext.upper()))
 
 # Settings file (in project directory)
 SETTINGS_FILE = Path('tile_videos_settings.json')
 
-# Default source folder for videos
-SRC_FOLDER = Path('src')
+# Number of ffprobe processes to run at once
+PROBE_THREADS = available_cpus()
+
+# Most source clips to compose in a single ffmpeg pass - every input keeps its
+# own demuxer and decoder open for the whole encode, so big graphs fall back
+# to encoding tiles one by one
+SINGLE_PASS_MAX_INPUTS = 16
+
+# Software x264 settings (hardware encoder settings are in _videotiling_utils)
+SOFTWARE_ENCODER_ARGS = ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23']
+# Tiles encoded to disk are re-encoded into the final layout, so x264 can trade
+# compression effort for speed there (a lower CRF keeps quality for the second pass)
+INTERMEDIATE_ENCODER_ARGS = ['-c:v', 'libx264', '-preset', 'faster', '-crf', '20']
+
+# Encoded tiles from earlier runs (re-used while the clips and tile settings are unchanged)
+TILE_CACHE_DIR = Path.home() / '.cache' / 'video-tiling' / 'tiles'
+
+# Largest total size of the tile cache; the least recently used tiles are removed beyond it
+TILE_CACHE_MAX_BYTES = 10 * 1024 ** 3
+
+# Unfinished tile encodes older than this (in seconds) are left over from interrupted runs
+TILE_CACHE_PARTIAL_MAX_AGE = 24 * 60 * 60
 
 # Layout definitions: (rows, cols, description, special_layout_function)
 LAYOUTS = {
@@ -48,6 +81,9 @@ TRANSITION_NAMES = {
     'fadeblack': 'Fade to Black'
 }
 
+# Prompt menu text, built once (the transition menu is shown for every tile)
+TRANSITION_MENU = '\n'.join(f"  {key}. {TRANSITION_NAMES[trans]}" for key, trans in TRANSITIONS.items())
+
 # ASCII art layouts
 LAYOUT_ASCII = {
     '2x1': [
@@ -136,6 +172,8 @@ CROP_MODE_NAMES = {
     'stretch': 'Stretch to fill (may distort)'
 }
 
+CROP_MODE_MENU = '\n'.join(f"  {key}. {CROP_MODE_NAMES[mode]}" for key, mode in CROP_MODES.items())
+
 CROP_POSITIONS = {
     '1': 'center',
     '2': 'top',
@@ -148,6 +186,19 @@ CROP_POSITIONS = {
     '9': 'bottom-right'
 }
 
+# crop filter x:y offsets for each position ('' lets crop center itself)
+CROP_OFFSETS = {
+    'center': '',
+    'top': ':0:0',
+    'bottom': ':0:ih-{h}',
+    'left': ':0:0',
+    'right': ':iw-{w}:0',
+    'top-left': ':0:0',
+    'top-right': ':iw-{w}:0',
+    'bottom-left': ':0:ih-{h}',
+    'bottom-right': ':iw-{w}:ih-{h}'
+}
+
 CROP_POSITION_NAMES = {
     'center': 'Center (default - crop evenly from all sides)',
     'top': 'Top (keep top, crop bottom)',
@@ -160,6 +211,9 @@ CROP_POSITION_NAMES = {
     'bottom-right': 'Bottom-Right corner'
 }
 
+# Prompt menu text, built once (the crop position menu is shown for every tile)
+CROP_POSITION_MENU = '\n'.join(f"    {key}. {CROP_POSITION_NAMES[pos]}" for key, pos in CROP_POSITIONS.items())
+
 DISTRIBUTION_MODES = {
     '1': 'round-robin',
     '2': 'sequential',
@@ -215,26 +269,6 @@ def display_saved_settings(settings):
     print(f"\n  Audio from: {settings['tile_folders'][settings['audio_tile']]}")
     print()
 
-def resolve_folder_path(folder_input):
-    """Resolve folder path, prepending src/ if it's a relative name."""
-    folder_path = Path(folder_input)
-
-    # If it's an absolute path or starts with ./ or ../, use as-is
-    if folder_path.is_absolute() or str(folder_input).startswith(('./', '../')):
-        return folder_path
-
-    # Otherwise, check if it exists in src/ folder
-    src_path = SRC_FOLDER / folder_input
-    if src_path.exists():
-        return src_path
-
-    # If neither exists, return the src path (will show error later)
-    if not folder_path.exists():
-        return src_path
-
-    # Original path exists, use it
-    return folder_path
-
 def display_layout(layout_code, tile_folders=None, num_tiles=None):
     """Display ASCII art layout with optional folder assignments."""
     ascii_art = LAYOUT_ASCII.get(layout_code, [])
@@ -251,305 +285,423 @@ def display_layout(layout_code, tile_folders=None, num_tiles=None):
         print(f"\n  Total tiles: {num_tiles}")
     print()
 
-def get_scale_filter(width, height, crop_mode='crop', crop_position='center', fps=30):
-    """Generate ffmpeg scale filter based on crop mode and position."""
+def get_scale_base(width, height, crop_mode='crop', crop_position='center'):
+    """Generate ffmpeg scale/crop/pad filter (without fps) based on crop mode and position."""
     if crop_mode == 'crop':
         # Crop to fill - scale to cover entire area, then crop with position
-        # Calculate crop position
-        if crop_position == 'center':
-            crop_filter = f'crop={width}:{height}'
-        elif crop_position == 'top':
-            crop_filter = f'crop={width}:{height}:0:0'
-        elif crop_position == 'bottom':
-            crop_filter = f'crop={width}:{height}:0:ih-{height}'
-        elif crop_position == 'left':
-            crop_filter = f'crop={width}:{height}:0:0'
-        elif crop_position == 'right':
-            crop_filter = f'crop={width}:{height}:iw-{width}:0'
-        elif crop_position == 'top-left':
-            crop_filter = f'crop={width}:{height}:0:0'
-        elif crop_position == 'top-right':
-            crop_filter = f'crop={width}:{height}:iw-{width}:0'
-        elif crop_position == 'bottom-left':
-            crop_filter = f'crop={width}:{height}:0:ih-{height}'
-        elif crop_position == 'bottom-right':
-            crop_filter = f'crop={width}:{height}:iw-{width}:ih-{height}'
-        else:
-            crop_filter = f'crop={width}:{height}'  # default to center
+        crop_offset = CROP_OFFSETS.get(crop_position, '').format(w=width, h=height)
+        crop_filter = f'crop={width}:{height}{crop_offset}'
 
-        return f'scale={width}:{height}:force_original_aspect_ratio=increase,{crop_filter},fps={fps}'
+        return f'scale={width}:{height}:force_original_aspect_ratio=increase,{crop_filter}'
     elif crop_mode == 'pad':
         # Pad to fit - scale to fit inside, then add black bars
-        return f'scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={fps}'
+        return f'scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2'
     elif crop_mode == 'stretch':
         # Stretch to fill - ignore aspect ratio
-        return f'scale={width}:{height},fps={fps}'
+        return f'scale={width}:{height}'
     else:
-        return f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},fps={fps}'
+        return get_scale_crop_filter(width, height)
+
+@functools.lru_cache(maxsize=None)
+def get_scale_crop_filter(width, height):
+    """Scale to cover width x height, then center-crop to exactly that size."""
+    return f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}'
+
+def get_scale_filter(width, height, crop_mode='crop', crop_position='center', fps=30, source_fps=None):
+    """Generate ffmpeg scale filter based on crop mode and position."""
+    return join_fps_filter(get_scale_base(width, height, crop_mode, crop_position), fps, source_fps)
+
+def join_fps_filter(scale_base, fps=30, source_fps=None):
+    """Combine a scale filter with an fps conversion.
+
+    When the source has more frames than the target rate, drop them before
+    scaling so swscale doesn't resize frames that are thrown away anyway.
+    """
+    if source_fps and source_fps > fps:
+        return f'fps={fps},{scale_base}'
+    return f'{scale_base},fps={fps}'
+
+def is_video_extension(ext):
+    """Check a file extension (including the dot) against VIDEO_EXTENSIONS."""
+    return ext in VIDEO_EXTENSIONS_CI or ext.lower() in VIDEO_EXTENSIONS
 
 def get_video_files(folder_path):
     """Get all video files in the specified folder, sorted alphabetically."""
     folder = Path(folder_path)
-    if not folder.exists():
+
+    # scandir gets the file type from the directory listing - no stat per entry
+    try:
+        with os.scandir(folder) as entries:
+            video_files = [Path(entry.path) for entry in entries
+                           if is_video_extension(os.path.splitext(entry.name)[1]) and entry.is_file()]
+    except FileNotFoundError:
         print(f"Error: Folder '{folder_path}' does not exist.")
         return []
-
-    video_files = [f for f in folder.iterdir()
-                   if f.is_file() and f.suffix.lower() in VIDEO_EXTENSIONS]
     return sorted(video_files, key=lambda x: x.name.lower())
 
+def _chunk(video_files, num_tiles):
+    """Split videos into num_tiles continuous runs, giving any remainder to the first runs."""
+    videos_per_tile, remainder = divmod(len(video_files), num_tiles)
+    distributed = []
+    start_idx = 0
+    for i in range(num_tiles):
+        end_idx = start_idx + videos_per_tile + (1 if i < remainder else 0)
+        distributed.append(video_files[start_idx:end_idx])
+        start_idx = end_idx
+    return distributed
+
 def distribute_videos(video_files, num_tiles, mode='round-robin'):
     """Distribute videos across tiles using specified mode."""
     import random
 
-    total_videos = len(video_files)
-
-    if mode == 'round-robin':
-        # Each tile gets every Nth video
-        distributed = [[] for _ in range(num_tiles)]
-        for i, video in enumerate(video_files):
-            tile_idx = i % num_tiles
-            distributed[tile_idx].append(video)
-        return distributed
-
-    elif mode == 'sequential':
+    if mode == 'sequential':
         # Divide into continuous chunks
-        videos_per_tile = total_videos // num_tiles
-        remainder = total_videos % num_tiles
+        return _chunk(video_files, num_tiles)
 
-        distributed = []
-        start_idx = 0
-
-        for i in range(num_tiles):
-            # Give extra videos to first tiles if there's a remainder
-            chunk_size = videos_per_tile + (1 if i < remainder else 0)
-            end_idx = start_idx + chunk_size
-            distributed.append(video_files[start_idx:end_idx])
-            start_idx = end_idx
-
-        return distributed
-
-    elif mode == 'random':
-        # Shuffle and distribute
-        shuffled = video_files.copy()
+    if mode == 'random':
+        # Shuffle a copy (the caller's list keeps its order) and divide into chunks
+        shuffled = list(video_files)
         random.shuffle(shuffled)
+        return _chunk(shuffled, num_tiles)
 
-        videos_per_tile = total_videos // num_tiles
-        remainder = total_videos % num_tiles
-
-        distributed = []
-        start_idx = 0
-
-        for i in range(num_tiles):
-            chunk_size = videos_per_tile + (1 if i < remainder else 0)
-            end_idx = start_idx + chunk_size
-            distributed.append(shuffled[start_idx:end_idx])
-            start_idx = end_idx
-
-        return distributed
-
-    else:
-        # Default to round-robin
-        return distribute_videos(video_files, num_tiles, 'round-robin')
+    # Round-robin (default): each tile gets every Nth video
+    return [video_files[i::num_tiles] for i in range(num_tiles)]
 
 def get_video_info(video_path):
-    """Get video duration and properties using ffprobe."""
+    """Get video duration and properties using ffprobe (cached per file version)."""
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return None
+    # Keyed on size and mtime too, so a re-encoded file (e.g. a tile) is probed again
+    return probe_video(str(Path(video_path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+@functools.lru_cache(maxsize=None)
+def probe_video(video_path, mtime_ns, size):
+    """Run ffprobe once for a resolved video path."""
     try:
         cmd = [
             'ffprobe',
             '-v', 'error',
             '-select_streams', 'v:0',
-            '-show_entries', 'stream=width,height,r_frame_rate:format=duration',
-            '-of', 'default=noprint_wrappers=1',
-            str(video_path)
+            '-show_entries', 'stream=codec_name,width,height,sample_aspect_ratio,r_frame_rate,avg_frame_rate:format=duration',
+            '-of', 'json',
+            video_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        # json.loads takes the raw bytes, so the output is never decoded into a str first
+        result = subprocess.run(cmd, capture_output=True, check=True)
+        probe = json.loads(result.stdout)
+        info = {**probe.get('format', {}), **(probe.get('streams') or [{}])[0]}
 
-        info = {}
-        for line in result.stdout.strip().split('\n'):
-            if '=' in line:
-                key, value = line.split('=', 1)
-                info[key] = value
+        # r_frame_rate is a fraction like 30000/1001
+        num, _, den = info.get('r_frame_rate', '0/1').partition('/')
+        fps = float(num) / float(den) if den and float(den) else 0.0
 
         return {
             'duration': float(info.get('duration', 0)),
             'width': int(info.get('width', 1920)),
-            'height': int(info.get('height', 1080))
+            'height': int(info.get('height', 1080)),
+            'fps': fps,
+            # Variable frame rate streams report an average that differs from r_frame_rate
+            'constant_fps': info.get('avg_frame_rate') == info.get('r_frame_rate'),
+            'sar': info.get('sample_aspect_ratio'),
+            'codec': info.get('codec_name')
         }
     except (subprocess.CalledProcessError, ValueError, KeyError):
         return None
 
-def create_tile_video(video_files, transition_type, duration, output_path, width, height, crop_mode='crop', crop_position='center'):
-    """Create a single tile video by concatenating videos from a folder."""
+def is_at_frame_rate(info, fps=30):
+    """Whether a probed clip already runs at a constant fps frames per second."""
+    return bool(info) and info['constant_fps'] and abs(info['fps'] - fps) < 0.01
+
+def is_square_at_size(info, width, height):
+    """Whether a probed clip is already width x height with square pixels."""
+    return bool(info) and info['sar'] == '1:1' and (info['width'], info['height']) == (width, height)
+
+def get_video_infos(video_files):
+    """Get info for several videos, running ffprobe in parallel."""
+    with ThreadPoolExecutor(max_workers=PROBE_THREADS) as executor:
+        return list(executor.map(get_video_info, video_files))
+
+def is_tile_ready(video_path, width, height, fps=30):
+    """Check if a clip can be used as a tile as-is (MP4/H.264 at the tile's size and constant frame rate).
+
+    Tiles are stacked without scale/setsar, so the clip also needs square
+    pixels (an unset SAR counts as square).
+    """
+    if video_path.suffix.lower() not in ('.mp4', '.m4v'):
+        return False
+    info = get_video_info(video_path)
+    return is_at_frame_rate(info, fps) and info['codec'] == 'h264' \
+        and (info['width'], info['height']) == (width, height) and info['sar'] in (None, '1:1', '0:1')
+
+def get_tile_cache_path(video_files, transition_type, duration, width, height, crop_mode, crop_position, video_args,
+                        include_audio=True):
+    """Return where an encoded tile is cached, keyed on its clips and every setting that affects it.
+
+    Returns None if a clip can't be stat'd.
+    """
+    key_parts = []
+    for video in video_files:
+        try:
+            stat = os.stat(video)
+        except OSError:
+            return None
+        # Clip order matters (it's the playback order), so the list isn't sorted
+        key_parts.append([str(Path(video).resolve()), stat.st_size, stat.st_mtime_ns])
+    key_parts.append([transition_type, duration, width, height, crop_mode, crop_position, list(video_args),
+                      include_audio])
+
+    key = hashlib.blake2b(json.dumps(key_parts).encode(), digest_size=8).hexdigest()
+    return TILE_CACHE_DIR / f"tile_{key}.mp4"
+
+def prune_tile_cache(keep=(), max_bytes=TILE_CACHE_MAX_BYTES):
+    """Remove least recently used cached tiles until the cache fits in max_bytes.
+
+    Tiles in keep (the ones the current run uses) are never removed.
+    """
+    try:
+        entries = [(entry.path, entry.stat()) for entry in os.scandir(TILE_CACHE_DIR) if entry.is_file()]
+    except OSError:
+        return
+
+    keep = {str(path) for path in keep}
+    now = time.time()
+    tiles = []
+    total = 0
+    for path, stat in entries:
+        if path.endswith('.partial.mp4'):
+            if now - stat.st_mtime > TILE_CACHE_PARTIAL_MAX_AGE:
+                Path(path).unlink(missing_ok=True)
+            continue
+        total += stat.st_size
+        if path not in keep:
+            tiles.append((stat.st_mtime, stat.st_size, path))
+
+    # Re-used tiles get their mtime bumped, so the oldest mtime is the least recently used
+    for _, size, path in sorted(tiles):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+
+def create_tile_video(video_files, transition_type, duration, output_path, width, height, crop_mode='crop', crop_position='center', threads=None, video_args=INTERMEDIATE_ENCODER_ARGS,
+                      include_audio=True):
+    """Create a single tile video by concatenating videos from a folder.
+
+    threads caps ffmpeg's thread count, for when several tiles encode at once.
+    include_audio=False leaves the audio out, for tiles whose sound isn't used.
+    """
     if not video_files:
         print("No videos to process for this tile")
         return None
 
     print(f"  Creating tile with {len(video_files)} video(s)...")
 
-    scale_filter = get_scale_filter(width, height, crop_mode, crop_position)
+    # Only drop frames before scaling if every clip is above the target rate,
+    # and skip the conversion entirely if every clip is already at it
+    infos = get_video_infos(video_files)
+    if all(is_at_frame_rate(info) for info in infos):
+        scale_filter = get_scale_base(width, height, crop_mode, crop_position)
+    else:
+        source_fps = min(info['fps'] for info in infos) if all(infos) else None
+        scale_filter = get_scale_filter(width, height, crop_mode, crop_position, source_fps=source_fps)
+    concat_input = None
+    audio_args = ['-c:a', 'aac', '-b:a', '192k'] if include_audio else ['-an']
 
-    if len(video_files) == 1 and transition_type == 'cut':
+    if len(video_files) == 1 and transition_type == 'cut' and is_tile_ready(video_files[0], width, height):
+        # Already H.264 at the tile's size and frame rate - remux instead of re-encoding
+        cmd = [
+            'ffmpeg',
+            '-i', str(video_files[0]),
+            '-c', 'copy',
+            *([] if include_audio else ['-an']),
+            '-y',
+            str(output_path)
+        ]
+    elif len(video_files) == 1 and transition_type == 'cut':
         # Single video, just scale it
         cmd = [
             'ffmpeg',
             '-i', str(video_files[0]),
             '-vf', scale_filter,
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',
-            '-c:a', 'aac',
-            '-b:a', '192k',
+            *video_args,
+            *audio_args,
             '-y',
             str(output_path)
         ]
     elif transition_type == 'cut':
-        # Multiple videos, simple concatenation
-        concat_list = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
-        try:
-            for video in video_files:
-                escaped_path = str(video.absolute()).replace("'", "'\\''")
-                concat_list.write(f"file '{escaped_path}'\n")
-            concat_list.close()
-
-            cmd = [
-                'ffmpeg',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', concat_list.name,
-                '-vf', scale_filter,
-                '-c:v', 'libx264',
-                '-preset', 'medium',
-                '-crf', '23',
-                '-c:a', 'aac',
-                '-b:a', '192k',
-                '-y',
-                str(output_path)
-            ]
-        finally:
-            pass  # We'll delete after ffmpeg runs
+        # Multiple videos, simple concatenation - the concat demuxer list is
+        # fed to ffmpeg on stdin, so there's no temp file to write or clean up
+        concat_lines = []
+        for video in video_files:
+            escaped_path = str(video.absolute()).replace("'", "'\\''")
+            concat_lines.append(f"file '{escaped_path}'\n")
+        concat_input = ''.join(concat_lines).encode()
+
+        cmd = [
+            'ffmpeg',
+            '-f', 'concat',
+            '-safe', '0',
+            '-protocol_whitelist', 'file,pipe',
+            '-i', 'pipe:0',
+            '-vf', scale_filter,
+            *video_args,
+            *audio_args,
+            '-y',
+            str(output_path)
+        ]
     else:
         # With transitions - use complex filter
-        cmd = build_tile_with_transitions(video_files, transition_type, duration, output_path, width, height, crop_mode, crop_position)
-        concat_list = None
+        cmd = build_tile_with_transitions(video_files, transition_type, duration, output_path, width, height, crop_mode, crop_position, video_args,
+                                          include_audio)
+
+    if threads:
+        # Insert before the output path so it applies to the encoder
+        cmd[-1:-1] = ['-threads', str(threads)]
+
+    # ffmpeg reports progress on stderr; keep it quiet so only errors are buffered
+    cmd[1:1] = ['-nostats']
 
     try:
-        subprocess.run(cmd, capture_output=True, check=True)
-        if concat_list:
-            os.unlink(concat_list.name)
+        subprocess.run(cmd, input=concat_input, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
 
         # Get the duration of created tile
         info = get_video_info(output_path)
         return info['duration'] if info else 0
     except subprocess.CalledProcessError as e:
         print(f"  Error creating tile: {e}")
-        if concat_list:
-            os.unlink(concat_list.name)
+        if e.stderr:
+            print(f"  {e.stderr.decode(errors='replace').strip()[-500:]}")
         return None
 
-def build_tile_with_transitions(video_files, transition_type, duration, output_path, width, height, crop_mode='crop', crop_position='center'):
-    """Build ffmpeg command for tile with transitions."""
-    num_videos = len(video_files)
-
-    # Build filter complex
+def get_tile_duration(durations, transition_type, duration):
+    """Length of a tile built from clips of the given durations."""
+    if transition_type == 'fade' and len(durations) > 1:
+        # Each cross-dissolve overlaps two clips by the transition duration
+        return sum(durations) - (len(durations) - 1) * duration
+    return sum(durations)
+
+def build_tile_filter(input_indices, durations, transition_type, duration, scale_base, out_video, out_audio=None,
+                      infos=None, tile_size=None):
+    """Build filter_complex parts that join ffmpeg inputs into one tile.
+
+    input_indices are the ffmpeg input numbers of the tile's clips and durations
+    their lengths. The tile's video ends up in [out_video] and, if out_audio is
+    given, its audio in [out_audio]. Intermediate labels are prefixed with
+    out_video so several tiles can share one graph. infos (the clips' probe
+    results, if known) decide where fps conversion runs: before scaling for
+    clips faster than the target, once after the concat when every clip is
+    known to be at or below it (or not at all if they're all at it), otherwise
+    at the end of each clip's chain. Clips already tile_size with square
+    pixels skip setsar.
+    """
     filter_parts = []
-
-    # Get scale filter without fps (we'll add it separately for transitions)
-    if crop_mode == 'crop':
-        # Build crop filter with position
-        if crop_position == 'center':
-            crop_filter = f'crop={width}:{height}'
-        elif crop_position == 'top':
-            crop_filter = f'crop={width}:{height}:0:0'
-        elif crop_position == 'bottom':
-            crop_filter = f'crop={width}:{height}:0:ih-{height}'
-        elif crop_position == 'left':
-            crop_filter = f'crop={width}:{height}:0:0'
-        elif crop_position == 'right':
-            crop_filter = f'crop={width}:{height}:iw-{width}:0'
-        elif crop_position == 'top-left':
-            crop_filter = f'crop={width}:{height}:0:0'
-        elif crop_position == 'top-right':
-            crop_filter = f'crop={width}:{height}:iw-{width}:0'
-        elif crop_position == 'bottom-left':
-            crop_filter = f'crop={width}:{height}:0:ih-{height}'
-        elif crop_position == 'bottom-right':
-            crop_filter = f'crop={width}:{height}:iw-{width}:ih-{height}'
-        else:
-            crop_filter = f'crop={width}:{height}'
-
-        scale_base = f'scale={width}:{height}:force_original_aspect_ratio=increase,{crop_filter}'
-    elif crop_mode == 'pad':
-        scale_base = f'scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2'
-    elif crop_mode == 'stretch':
-        scale_base = f'scale={width}:{height}'
-    else:
-        scale_base = f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}'
+    num_videos = len(input_indices)
+    video_labels = [f'{out_video}_v{i}' for i in range(num_videos)]
+    audio_labels = [f'{out_video}_a{i}' for i in range(num_videos)]
+
+    # xfade needs both inputs at the same rate, so cross-dissolves always convert per clip
+    joined_by_concat = transition_type != 'fade' or num_videos == 1
+    fps_per_clip = not (joined_by_concat and infos is not None
+                        and all(info and info['fps'] <= 30 for info in infos))
+    # Nothing to convert when the concatenated clips are all at 30 fps already
+    fps_after_concat = not fps_per_clip and not all(is_at_frame_rate(info) for info in infos)
+    concat_video = f'{out_video}_cat' if fps_after_concat else out_video
+
+    # A single clip has nothing to join - its chains write straight to the tile's labels
+    if num_videos == 1:
+        video_labels = [concat_video]
+        audio_labels = [out_audio]
 
     # Scale all videos
-    for i in range(num_videos):
-        filter_parts.append(f"[{i}:v]{scale_base},setsar=1,fps=30[v{i}]")
-        filter_parts.append(f"[{i}:a]aformat=sample_rates=48000:channel_layouts=stereo[a{i}]")
-
-    if transition_type == 'fade':
-        # Cross-dissolve transitions
-        offsets = [0]
-        for i, video in enumerate(video_files[:-1]):
-            info = get_video_info(video)
-            if info:
-                offsets.append(offsets[-1] + info['duration'] - duration)
-
-        current_v = 'v0'
-        current_a = 'a0'
+    for i, input_index in enumerate(input_indices):
+        info = infos[i] if infos else None
+        video_chain = scale_base
+        if not (tile_size and is_square_at_size(info, *tile_size)):
+            video_chain += ',setsar=1'
+        if fps_per_clip:
+            video_chain = join_fps_filter(video_chain, 30, info['fps'] if info else None)
+        filter_parts.append(f"[{input_index}:v]{video_chain}[{video_labels[i]}]")
+        if out_audio:
+            filter_parts.append(f"[{input_index}:a]aformat=sample_rates=48000:channel_layouts=stereo[{audio_labels[i]}]")
+
+    if transition_type == 'fade' and num_videos > 1:
+        # Cross-dissolve transitions - each clip starts fading in one
+        # transition before the previous one ends (prefix sum of the overlaps)
+        offsets = list(itertools.accumulate((vid_duration - duration for vid_duration in durations[:-1]),
+                                            initial=0.0))
+
+        current_v = video_labels[0]
+        current_a = audio_labels[0]
 
         for i in range(1, num_videos):
-            next_label_v = f'v{i}{i}' if i < num_videos - 1 else 'outv'
-            next_label_a = f'a{i}{i}' if i < num_videos - 1 else 'outa'
+            next_label_v = f'{out_video}_x{i}' if i < num_videos - 1 else out_video
+            next_label_a = f'{out_video}_ax{i}' if i < num_videos - 1 else out_audio
 
             filter_parts.append(
-                f"[{current_v}][v{i}]xfade=transition=fade:duration={duration}:offset={offsets[i]:.3f}[{next_label_v}]"
+                f"[{current_v}][{video_labels[i]}]xfade=transition=fade:duration={duration}:offset={offsets[i]:.3f}[{next_label_v}]"
             )
-            filter_parts.append(f"[{current_a}][a{i}]acrossfade=d={duration}[{next_label_a}]")
+            if out_audio:
+                filter_parts.append(f"[{current_a}][{audio_labels[i]}]acrossfade=d={duration}[{next_label_a}]")
 
             current_v = next_label_v
             current_a = next_label_a
 
-    else:  # fadeblack
+    elif transition_type == 'fadeblack' and num_videos > 1:
         fade_time = duration / 2
         concat_inputs = []
 
-        for i, video in enumerate(video_files):
-            info = get_video_info(video)
-            if not info:
-                continue
-            vid_duration = info['duration']
-
+        for i, vid_duration in enumerate(durations):
             if i == 0:
-                filter_parts.append(
-                    f"[v{i}]fade=t=out:st={vid_duration - fade_time}:d={fade_time}[vf{i}]"
-                )
-                filter_parts.append(
-                    f"[a{i}]afade=t=out:st={vid_duration - fade_time}:d={fade_time}[af{i}]"
-                )
+                video_fade = f"fade=t=out:st={vid_duration - fade_time}:d={fade_time}"
+                audio_fade = f"afade=t=out:st={vid_duration - fade_time}:d={fade_time}"
             elif i == num_videos - 1:
-                filter_parts.append(
-                    f"[v{i}]fade=t=in:st=0:d={fade_time}[vf{i}]"
-                )
-                filter_parts.append(
-                    f"[a{i}]afade=t=in:st=0:d={fade_time}[af{i}]"
-                )
+                video_fade = f"fade=t=in:st=0:d={fade_time}"
+                audio_fade = f"afade=t=in:st=0:d={fade_time}"
             else:
-                filter_parts.append(
-                    f"[v{i}]fade=t=in:st=0:d={fade_time},fade=t=out:st={vid_duration - fade_time}:d={fade_time}[vf{i}]"
-                )
-                filter_parts.append(
-                    f"[a{i}]afade=t=in:st=0:d={fade_time},afade=t=out:st={vid_duration - fade_time}:d={fade_time}[af{i}]"
-                )
+                video_fade = f"fade=t=in:st=0:d={fade_time},fade=t=out:st={vid_duration - fade_time}:d={fade_time}"
+                audio_fade = f"afade=t=in:st=0:d={fade_time},afade=t=out:st={vid_duration - fade_time}:d={fade_time}"
+
+            filter_parts.append(f"[{video_labels[i]}]{video_fade}[{out_video}_vf{i}]")
+            concat_inputs.append(f"[{out_video}_vf{i}]")
+            if out_audio:
+                filter_parts.append(f"[{audio_labels[i]}]{audio_fade}[{out_video}_af{i}]")
+                concat_inputs.append(f"[{out_video}_af{i}]")
+
+        outputs = f"[{concat_video}][{out_audio}]" if out_audio else f"[{concat_video}]"
+        filter_parts.append(f"{''.join(concat_inputs)}concat=n={num_videos}:v=1:a={1 if out_audio else 0}{outputs}")
 
-            concat_inputs.append(f"[vf{i}][af{i}]")
+    elif num_videos > 1:
+        # Simple cuts
+        concat_inputs = []
+        for i in range(num_videos):
+            concat_inputs.append(f"[{video_labels[i]}]")
+            if out_audio:
+                concat_inputs.append(f"[{audio_labels[i]}]")
+
+        outputs = f"[{concat_video}][{out_audio}]" if out_audio else f"[{concat_video}]"
+        filter_parts.append(f"{''.join(concat_inputs)}concat=n={num_videos}:v=1:a={1 if out_audio else 0}{outputs}")
+
+    if fps_after_concat:
+        # One rate conversion for the whole tile instead of one per clip
+        filter_parts.append(f"[{concat_video}]fps=30[{out_video}]")
 
-        filter_parts.append(f"{''.join(concat_inputs)}concat=n={num_videos}:v=1:a=1[outv][outa]")
+    return filter_parts
+
+def build_tile_with_transitions(video_files, transition_type, duration, output_path, width, height, crop_mode='crop', crop_position='center', video_args=INTERMEDIATE_ENCODER_ARGS,
+                                include_audio=True):
+    """Build ffmpeg command for tile with transitions."""
+    scale_base = get_scale_base(width, height, crop_mode, crop_position)
 
+    # Probe every clip up front (in parallel) instead of one at a time while building the graph
+    infos = get_video_infos(video_files)
+    durations = [info['duration'] if info else 0 for info in infos]
+    filter_parts = build_tile_filter(range(len(video_files)), durations, transition_type, duration,
+                                     scale_base, 'outv', 'outa' if include_audio else None, infos, (width, height))
     filter_complex = ';'.join(filter_parts)
 
     # Build command
@@ -560,12 +712,9 @@ def build_tile_with_transitions(video_files, transition_type, duration, output_p
     cmd.extend([
         '-filter_complex', filter_complex,
         '-map', '[outv]',
-        '-map', '[outa]',
-        '-c:v', 'libx264',
-        '-preset', 'medium',
-        '-crf', '23',
-        '-c:a', 'aac',
-        '-b:a', '192k',
+        *(['-map', '[outa]'] if include_audio else []),
+        *video_args,
+        *(['-c:a', 'aac', '-b:a', '192k'] if include_audio else []),
         '-y',
         str(output_path)
     ])
@@ -588,17 +737,55 @@ def get_layout_info(layout_code):
     }
     return layouts.get(layout_code, None)
 
-def build_xstack_layout(layout_code, tile_paths, audio_tile, output_width=1920, output_height=1080):
-    """Build the final tiled composition using xstack or overlay."""
+def build_xstack_layout(layout_code, tile_paths, audio_tile, output_width=1920, output_height=1080, video_args=SOFTWARE_ENCODER_ARGS,
+                        tile_durations=None):
+    """Build the final tiled composition using xstack or overlay.
+
+    If tile_durations is given, tiles shorter than the longest one are looped
+    on input and the output is cut to the longest tile's length.
+    """
+    input_labels = tuple(f"{i}:v" for i in range(len(tile_paths)))
+    filter_complex = render_layout_filter(layout_code, input_labels, output_width, output_height)
+    max_duration = max(tile_durations) if tile_durations else None
+
+    # Build command
+    cmd = ['ffmpeg']
+    for i, tile_path in enumerate(tile_paths):
+        if max_duration and tile_durations[i] < max_duration - 0.1:
+            cmd.extend(['-stream_loop', '-1'])
+        cmd.extend(['-i', str(tile_path)])
+
+    cmd.extend([
+        '-filter_complex', filter_complex,
+        '-map', '[outv]',
+        '-map', f'{audio_tile}:a',
+        *video_args,
+        '-c:a', 'aac',
+        '-b:a', '192k',
+    ])
+    if max_duration:
+        cmd.extend(['-t', str(max_duration)])
+    cmd.append('-y')
+
+    return cmd
+
+@functools.lru_cache(maxsize=64)
+def render_layout_filter(layout_code, input_labels, output_width, output_height):
+    """Build the layout's filter_complex string, ending in [outv].
+
+    Depends only on the layout, input labels (a tuple) and output size, so
+    it's built once and reused.
+    """
     layout_info = get_layout_info(layout_code)
 
     if layout_info['type'] == 'grid':
-        return build_grid_layout(layout_info['rows'], layout_info['cols'], tile_paths, audio_tile, output_width, output_height)
+        filter_parts = build_grid_filter(layout_info['rows'], layout_info['cols'], input_labels, output_width, output_height)
     else:
-        return build_special_layout(layout_code, tile_paths, audio_tile, output_width, output_height)
+        filter_parts = build_special_filter(layout_code, input_labels, output_width, output_height)
+    return ';'.join(filter_parts)
 
-def build_grid_layout(rows, cols, tile_paths, audio_tile, output_width, output_height):
-    """Build a grid layout using xstack."""
+def build_grid_filter(rows, cols, input_labels, output_width, output_height):
+    """Build the xstack filter parts for a grid layout of already-sized tiles."""
     tile_width = output_width // cols
     tile_height = output_height // rows
 
@@ -612,131 +799,226 @@ def build_grid_layout(rows, cols, tile_paths, audio_tile, output_width, output_h
 
     layout_str = '|'.join(layout_positions)
 
-    # Tiles are already the same duration (looped earlier), just stack them
-    inputs = ''.join([f"[{i}:v]" for i in range(len(tile_paths))])
-    filter_complex = f"{inputs}xstack=inputs={len(tile_paths)}:layout={layout_str}[outv]"
+    # Tiles all run for the longest tile's length (short ones are looped), just stack them
+    inputs = ''.join([f"[{label}]" for label in input_labels])
+    return [f"{inputs}xstack=inputs={len(input_labels)}:layout={layout_str}[outv]"]
 
-    # Build command
-    cmd = ['ffmpeg']
-    for tile_path in tile_paths:
-        cmd.extend(['-i', str(tile_path)])
+def build_special_filter(layout_code, input_labels, output_width, output_height):
+    """Build the filter parts for special layouts like PIP, 1+2, etc.
 
-    cmd.extend([
-        '-filter_complex', filter_complex,
-        '-map', '[outv]',
-        '-map', f'{audio_tile}:a',
-        '-c:v', 'libx264',
-        '-preset', 'medium',
-        '-crf', '23',
-        '-c:a', 'aac',
-        '-b:a', '192k',
-        '-y'
-    ])
-
-    return cmd
-
-def build_special_layout(layout_code, tile_paths, audio_tile, output_width, output_height):
-    """Build special layouts like PIP, 1+2, etc."""
+    Tiles are already rendered at their slot size (see get_tile_sizes), so
+    they're placed as-is without scaling them again.
+    """
     filter_parts = []
 
-    # Tiles are already the same duration (looped earlier)
+    # Tiles all run for the longest tile's length (short ones are looped)
     if layout_code == 'pip':
         # Large background + small overlay in top-right
-        main_w, main_h = output_width, output_height
-        pip_w, pip_h = output_width // 4, output_height // 4
+        pip_w = output_width // 4
         pip_x, pip_y = output_width - pip_w - 20, 20  # 20px margin
 
-        filter_parts.append(
-            f"[0:v]scale={main_w}:{main_h}:force_original_aspect_ratio=increase,"
-            f"crop={main_w}:{main_h}[main]"
-        )
-        filter_parts.append(
-            f"[1:v]scale={pip_w}:{pip_h}:force_original_aspect_ratio=increase,"
-            f"crop={pip_w}:{pip_h}[pip]"
-        )
-        filter_parts.append(f"[main][pip]overlay={pip_x}:{pip_y}[outv]")
+        filter_parts.append(f"[{input_labels[0]}][{input_labels[1]}]overlay={pip_x}:{pip_y}[outv]")
 
     elif layout_code == '1+2':
         # One large left (2/3 width), two stacked right (1/3 width)
-        left_w = (output_width * 2) // 3
-        right_w = output_width // 3
-        right_h = output_height // 2
-
-        filter_parts.append(
-            f"[0:v]scale={left_w}:{output_height}:force_original_aspect_ratio=increase,"
-            f"crop={left_w}:{output_height}[left]"
-        )
-        filter_parts.append(
-            f"[1:v]scale={right_w}:{right_h}:force_original_aspect_ratio=increase,"
-            f"crop={right_w}:{right_h}[top_right]"
-        )
-        filter_parts.append(
-            f"[2:v]scale={right_w}:{right_h}:force_original_aspect_ratio=increase,"
-            f"crop={right_w}:{right_h}[bottom_right]"
-        )
-        filter_parts.append(f"[top_right][bottom_right]vstack[right]")
-        filter_parts.append(f"[left][right]hstack[outv]")
+        filter_parts.append(f"[{input_labels[1]}][{input_labels[2]}]vstack[right]")
+        filter_parts.append(f"[{input_labels[0]}][right]hstack[outv]")
 
     elif layout_code == '2+1':
         # Two stacked left (1/3 width), one large right (2/3 width)
-        left_w = output_width // 3
-        left_h = output_height // 2
-        right_w = (output_width * 2) // 3
-
-        filter_parts.append(
-            f"[0:v]scale={left_w}:{left_h}:force_original_aspect_ratio=increase,"
-            f"crop={left_w}:{left_h}[top_left]"
-        )
-        filter_parts.append(
-            f"[1:v]scale={left_w}:{left_h}:force_original_aspect_ratio=increase,"
-            f"crop={left_w}:{left_h}[bottom_left]"
-        )
-        filter_parts.append(
-            f"[2:v]scale={right_w}:{output_height}:force_original_aspect_ratio=increase,"
-            f"crop={right_w}:{output_height}[right]"
-        )
-        filter_parts.append(f"[top_left][bottom_left]vstack[left]")
-        filter_parts.append(f"[left][right]hstack[outv]")
+        filter_parts.append(f"[{input_labels[0]}][{input_labels[1]}]vstack[left]")
+        filter_parts.append(f"[left][{input_labels[2]}]hstack[outv]")
 
     elif layout_code == '1+3':
         # One large top (2/3 height), three small bottom (1/3 height)
-        top_h = (output_height * 2) // 3
-        bottom_h = output_height // 3
-        bottom_w = output_width // 3
-
-        filter_parts.append(
-            f"[0:v]scale={output_width}:{top_h}:force_original_aspect_ratio=increase,"
-            f"crop={output_width}:{top_h}[top]"
-        )
-        filter_parts.append(
-            f"[1:v]scale={bottom_w}:{bottom_h}:force_original_aspect_ratio=increase,"
-            f"crop={bottom_w}:{bottom_h}[b1]"
-        )
-        filter_parts.append(
-            f"[2:v]scale={bottom_w}:{bottom_h}:force_original_aspect_ratio=increase,"
-            f"crop={bottom_w}:{bottom_h}[b2]"
-        )
-        filter_parts.append(
-            f"[3:v]scale={bottom_w}:{bottom_h}:force_original_aspect_ratio=increase,"
-            f"crop={bottom_w}:{bottom_h}[b3]"
-        )
-        filter_parts.append(f"[b1][b2][b3]hstack=inputs=3[bottom]")
-        filter_parts.append(f"[top][bottom]vstack[outv]")
+        filter_parts.append(f"[{input_labels[1]}][{input_labels[2]}][{input_labels[3]}]hstack=inputs=3[bottom]")
+        filter_parts.append(f"[{input_labels[0]}][bottom]vstack[outv]")
 
-    filter_complex = ';'.join(filter_parts)
+    return filter_parts
+
+def get_tile_sizes(layout_code, output_width, output_height):
+    """Get the (width, height) each tile is rendered at for a layout, in tile order."""
+    layout_info = get_layout_info(layout_code)
+    if layout_info['type'] == 'grid':
+        tile_size = (output_width // layout_info['cols'], output_height // layout_info['rows'])
+        return [tile_size] * layout_info['count']
+
+    # Special layouts: each tile gets the size of its slot
+    if layout_code == 'pip':
+        return [(output_width, output_height), (output_width // 4, output_height // 4)]
+    elif layout_code == '1+2':
+        small = (output_width // 3, output_height // 2)
+        return [((output_width * 2) // 3, output_height), small, small]
+    elif layout_code == '2+1':
+        small = (output_width // 3, output_height // 2)
+        return [small, small, ((output_width * 2) // 3, output_height)]
+    elif layout_code == '1+3':
+        small = (output_width // 3, output_height // 3)
+        return [(output_width, (output_height * 2) // 3), small, small, small]
+    return [(output_width, output_height)] * layout_info['count']
+
+def get_tile_sequences(tile_settings, list_dir=None, encoded_tiles=None):
+    """Work out which clips every tile reads in a single-pass encode.
+
+    Shorter tiles repeat their clip list until they cover the longest tile.
+    Tiles in encoded_tiles ({index: (path, duration)}) are already encoded
+    and read as one input. Returns the longest tile's duration and, per tile,
+    (sequence, durations, use_list, num_inputs), or None if a clip can't be
+    probed or a tile is too short to loop.
+    """
+    # Tile lengths come from the clip durations - nothing has to be encoded first
+    tile_durations = []
+    tile_clip_durations = []
+    for i, (videos, trans_type, trans_duration, _) in enumerate(tile_settings):
+        if encoded_tiles and i in encoded_tiles:
+            tile_clip_durations.append(None)
+            tile_durations.append(encoded_tiles[i][1])
+            continue
+        if not videos:
+            return None
+        infos = get_video_infos(videos)
+        if not all(infos):
+            return None
+        durations = [info['duration'] for info in infos]
+        tile_clip_durations.append(durations)
+        tile_durations.append(get_tile_duration(durations, trans_type, trans_duration))
+
+    max_duration = max(tile_durations)
+
+    # Loop shorter tiles by repeating their clip list, then trim to the longest
+    tile_sequences = []
+    for (videos, trans_type, trans_duration, _), durations, tile_duration in zip(
+            tile_settings, tile_clip_durations, tile_durations):
+        if durations is None:
+            tile_sequences.append((None, None, False, 1))
+            continue
+        repeats = 1
+        if tile_duration < max_duration - 0.1:
+            # Each repeat of the clip list adds its length minus one overlap per clip
+            overlap = trans_duration if trans_type == 'fade' else 0
+            repeat_length = sum(durations) - len(durations) * overlap
+            if repeat_length <= 0:
+                return None
+            repeats = max(1, math.ceil((max_duration - overlap) / repeat_length))
+        sequence, sequence_durations = list(videos) * repeats, durations * repeats
+        # A cut-only tile can be one concat demuxer input, which opens its clips
+        # one after another instead of keeping a decoder open per clip
+        use_list = bool(list_dir) and trans_type == 'cut' and len(sequence) > 1
+        tile_sequences.append((sequence, sequence_durations, use_list, 1 if use_list else len(sequence)))
+
+    return max_duration, tile_sequences
+
+def choose_tiles_to_encode(tile_settings, list_dir=None):
+    """Pick the fewest tiles to encode ahead of time so the rest fit in one pass.
+
+    Tiles that take the most inputs go first. Returns their indices, or None
+    if every tile would have to be encoded anyway or a clip can't be probed.
+    """
+    plan = get_tile_sequences(tile_settings, list_dir)
+    if plan is None:
+        return None
+    _, tile_sequences = plan
+
+    input_counts = [num_inputs for *_, num_inputs in tile_sequences]
+    total = sum(input_counts)
+    chosen = []
+    for i in sorted(range(len(input_counts)), key=input_counts.__getitem__, reverse=True):
+        if total <= SINGLE_PASS_MAX_INPUTS:
+            break
+        chosen.append(i)
+        total -= input_counts[i] - 1
+
+    if total > SINGLE_PASS_MAX_INPUTS or len(chosen) == len(tile_settings):
+        return None
+    return sorted(chosen)
+
+def build_single_pass_command(layout_code, tile_settings, crop_mode, audio_tile, output_width=1920, output_height=1080,
+                              video_args=SOFTWARE_ENCODER_ARGS, list_dir=None, encoded_tiles=None):
+    """Build one ffmpeg command that builds, loops and stacks all tiles in a single encode.
+
+    Avoids encoding every tile to disk and decoding it again for the final
+    layout. If list_dir is given, tiles joined with plain cuts read their
+    clips through a concat demuxer list written there, so each takes a single
+    input. Tiles in encoded_tiles ({index: (path, duration)}) were encoded
+    ahead of time and are only looped and stacked. Returns None if a clip
+    can't be probed or the composition needs more than SINGLE_PASS_MAX_INPUTS
+    inputs; use choose_tiles_to_encode() or the tile-by-tile pipeline then.
+    """
+    tile_sizes = get_tile_sizes(layout_code, output_width, output_height)
+
+    plan = get_tile_sequences(tile_settings, list_dir, encoded_tiles)
+    if plan is None:
+        return None
+    max_duration, tile_sequences = plan
+    if sum(num_inputs for *_, num_inputs in tile_sequences) > SINGLE_PASS_MAX_INPUTS:
+        return None
 
-    # Build command
     cmd = ['ffmpeg']
-    for tile_path in tile_paths:
-        cmd.extend(['-i', str(tile_path)])
+    filter_parts = []
+    tile_labels = []
+    input_index = 0
+
+    for i, ((sequence, durations, use_list, _), (videos, trans_type, trans_duration, crop_position)) in enumerate(
+            zip(tile_sequences, tile_settings)):
+        tile_width, tile_height = tile_sizes[i]
+        scale_base = get_scale_base(tile_width, tile_height, crop_mode, crop_position)
+        out_audio = f'tile{i}a' if i == audio_tile else None
+
+        if encoded_tiles and i in encoded_tiles:
+            # Already at tile size and frame rate - just loop it and cut it to length
+            tile_path, tile_duration = encoded_tiles[i]
+            if tile_duration < max_duration - 0.1:
+                cmd.extend(['-stream_loop', '-1'])
+            cmd.extend(['-i', str(tile_path)])
+            filter_parts.append(f"[{input_index}:v]trim=duration={max_duration:.3f},setpts=PTS-STARTPTS[tile{i}t]")
+            tile_labels.append(f'tile{i}t')
+            if out_audio:
+                filter_parts.append(f"[{input_index}:a]atrim=duration={max_duration:.3f},asetpts=PTS-STARTPTS[outa]")
+            input_index += 1
+            continue
+
+        if use_list:
+            list_path = Path(list_dir) / f"tile_{i}_concat.txt"
+            # A looped tile repeats its clip list, so escape each path once and
+            # write the whole block once per repeat
+            list_block = ''.join(
+                "file '{}'\n".format(str(video.absolute()).replace("'", "'\\''")) for video in videos)
+            with open(list_path, 'w') as f:
+                f.write(list_block * (len(sequence) // len(videos)))
+            cmd.extend(['-f', 'concat', '-safe', '0', '-i', str(list_path)])
+            # The clips arrive as one stream, so fps/setsar can't be skipped per clip
+            filter_parts.extend(build_tile_filter([input_index], [sum(durations)], 'cut', 0,
+                                                  scale_base, f'tile{i}', out_audio))
+            input_index += 1
+        else:
+            for video in sequence:
+                cmd.extend(['-i', str(video)])
+            input_indices = range(input_index, input_index + len(sequence))
+            input_index += len(sequence)
+
+            infos = [get_video_info(video) for video in sequence]
+            filter_parts.extend(build_tile_filter(input_indices, durations, trans_type, trans_duration,
+                                                  scale_base, f'tile{i}', out_audio, infos,
+                                                  (tile_width, tile_height)))
+
+        # Trim looped tiles to the longest tile's length
+        if len(sequence) > len(videos):
+            filter_parts.append(f"[tile{i}]trim=duration={max_duration:.3f},setpts=PTS-STARTPTS[tile{i}t]")
+            tile_labels.append(f'tile{i}t')
+            if out_audio:
+                filter_parts.append(f"[{out_audio}]atrim=duration={max_duration:.3f},asetpts=PTS-STARTPTS[outa]")
+        else:
+            tile_labels.append(f'tile{i}')
+            if out_audio:
+                filter_parts.append(f"[{out_audio}]anull[outa]")
+
+    filter_parts.append(render_layout_filter(layout_code, tuple(tile_labels), output_width, output_height))
 
     cmd.extend([
-        '-filter_complex', filter_complex,
+        '-filter_complex', ';'.join(filter_parts),
         '-map', '[outv]',
-        '-map', f'{audio_tile}:a',
-        '-c:v', 'libx264',
-        '-preset', 'medium',
-        '-crf', '23',
+        '-map', '[outa]',
+        *video_args,
         '-c:a', 'aac',
         '-b:a', '192k',
         '-y'
@@ -744,6 +1026,16 @@ def build_special_layout(layout_code, tile_paths, audio_tile, output_width, outp
 
     return cmd
 
+def print_output_info(output_path):
+    """Report the finished video's location, duration and resolution."""
+    print(f"\n✓ Successfully created: {output_path.absolute()}")
+
+    # Get output info
+    info = get_video_info(output_path)
+    if info:
+        print(f"  Duration: {info['duration']:.2f}s")
+        print(f"  Resolution: {info['width']}x{info['height']}")
+
 def main():
     parser = argparse.ArgumentParser(
         description='Create tiled video layouts with multiple videos playing simultaneously.',
@@ -763,21 +1055,37 @@ Note: Requires ffmpeg to be installed.
                         help='Output video width (default: 1920)')
     parser.add_argument('--height', type=int, default=1080,
                         help='Output video height (default: 1080)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of tiles to encode in parallel (default: 1)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-encode every tile instead of re-using tiles cached by earlier runs')
+    parser.add_argument('--encoder', choices=['auto', 'libx264', *HW_ENCODER_ARGS], default='auto',
+                        help='Video encoder (default: auto - hardware encoder if available, else libx264)')
 
     args = parser.parse_args()
 
     # Check if ffmpeg and ffprobe are available
     try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        subprocess.run(['ffprobe', '-version'], capture_output=True, check=True)
+        subprocess.run(['ffmpeg', '-version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        subprocess.run(['ffprobe', '-version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
     except (subprocess.CalledProcessError, FileNotFoundError):
         print("Error: ffmpeg and ffprobe must be installed.")
         print("Install with: brew install ffmpeg  (on macOS)")
         sys.exit(1)
 
+    # Pick the video encoder once for every encode in this run
+    encoder = detect_hw_encoder() if args.encoder == 'auto' else args.encoder
+    if encoder in HW_ENCODER_ARGS:
+        video_args = tile_video_args = HW_ENCODER_ARGS[encoder]
+    else:
+        encoder = 'libx264'
+        video_args = SOFTWARE_ENCODER_ARGS
+        tile_video_args = INTERMEDIATE_ENCODER_ARGS
+
     print("=" * 60)
     print("Video Tiling Tool")
     print("=" * 60)
+    print(f"Video encoder: {encoder}")
 
     # Check for saved settings
     use_saved = False
@@ -844,8 +1152,7 @@ Note: Requires ffmpeg to be installed.
 
         # Get crop mode
         print("How should videos be fitted to tiles?")
-        for key, mode in CROP_MODES.items():
-            print(f"  {key}. {CROP_MODE_NAMES[mode]}")
+        print(CROP_MODE_MENU)
 
         while True:
             crop_choice = input("\nSelect fit mode (1-3, default 1): ").strip() or '1'
@@ -930,9 +1237,7 @@ Note: Requires ffmpeg to be installed.
                 print(f"\nTile {i + 1}: {len(videos)} video(s) from '{folder}'")
 
             if len(videos) > 1:
-                print("  1. Simple Cut")
-                print("  2. Cross-Dissolve")
-                print("  3. Fade to Black")
+                print(TRANSITION_MENU)
 
                 while True:
                     trans_choice = input(f"Transition for tile {i + 1} (1-3): ").strip()
@@ -959,8 +1264,7 @@ Note: Requires ffmpeg to be installed.
             crop_position = 'center'
             if crop_mode == 'crop':
                 print(f"\n  Crop position for tile {i + 1}:")
-                for key, pos in CROP_POSITIONS.items():
-                    print(f"    {key}. {CROP_POSITION_NAMES[pos]}")
+                print(CROP_POSITION_MENU)
 
                 while True:
                     pos_choice = input(f"  Select crop position (1-9, default 1): ").strip() or '1'
@@ -1018,10 +1322,11 @@ Note: Requires ffmpeg to be installed.
         output_dir.mkdir(exist_ok=True)
 
         # Generate filename from layout and folder names
-        folder_names = '_'.join([Path(f).name for f in tile_folders])
-        # Limit filename length
-        if len(folder_names) > 100:
-            folder_names = folder_names[:100]
+        folder_names = '_'.join(Path(f).name for f in tile_folders)
+        # Bound filename length; a hash of the full join keeps long names unique
+        if len(folder_names) > 60:
+            digest = hashlib.blake2b(folder_names.encode(), digest_size=4).hexdigest()
+            folder_names = f"{folder_names[:50]}_{digest}"
 
         output_filename = f"{layout_code}_{folder_names}.mp4"
         args.output = str(output_dir / output_filename)
@@ -1054,103 +1359,151 @@ Note: Requires ffmpeg to be installed.
     print("Creating tiled video...")
     print("=" * 60)
 
-    # Create temporary tile videos
+    output_path = Path(args.output)
+
+    # Probe every clip once, in parallel, up front - later lookups hit the cache
+    all_videos = list(dict.fromkeys(video for videos, *_ in tile_settings for video in videos))
+    get_video_infos(all_videos)
+
+    # Temporary files (concat lists, tile videos)
     temp_dir = tempfile.mkdtemp()
-    tile_paths = []
 
     # Calculate tile dimensions
-    if layout_info['type'] == 'grid':
-        tile_width = args.width // layout_info['cols']
-        tile_height = args.height // layout_info['rows']
-    else:
-        # For special layouts, we'll use full resolution and let the layout handle scaling
-        tile_width = args.width
-        tile_height = args.height
-
-    tile_durations = []
-    for i, (videos, trans_type, trans_duration, crop_position) in enumerate(tile_settings):
+    tile_sizes = get_tile_sizes(layout_code, args.width, args.height)
+
+    # Tiles are independent encodes, so several can run at once; split the
+    # CPUs between them so the parallel ffmpegs don't oversubscribe the machine
+    tile_jobs = max(1, min(args.jobs, len(tile_settings)))
+    if encoder == 'h264_nvenc':
+        tile_jobs = min(tile_jobs, NVENC_MAX_SESSIONS)
+    encoder_threads = max(1, available_cpus() // tile_jobs) if tile_jobs > 1 else None
+
+    def encode_tile(i, tile_setting):
+        videos, trans_type, trans_duration, crop_position = tile_setting
+        tile_width, tile_height = tile_sizes[i]
+        # Only the audio tile's sound reaches the output, so the others skip the audio encode
+        include_audio = i == audio_tile
         print(f"\nProcessing tile {i + 1}...")
-        temp_tile = Path(temp_dir) / f"tile_{i}.mp4"
-        duration = create_tile_video(videos, trans_type, trans_duration, temp_tile, tile_width, tile_height, crop_mode, crop_position)
 
-        if duration is not None:
-            tile_paths.append(temp_tile)
-            tile_durations.append(duration)
-            print(f"  ✓ Tile {i + 1} created ({duration:.2f}s)")
+        cached_tile = None
+        if not args.no_cache:
+            cached_tile = get_tile_cache_path(videos, trans_type, trans_duration, tile_width, tile_height,
+                                              crop_mode, crop_position, tile_video_args, include_audio)
+        if cached_tile and cached_tile.exists():
+            info = get_video_info(cached_tile)
+            if info:
+                print(f"  Re-using cached tile {i + 1} (clips and settings unchanged)")
+                try:
+                    os.utime(cached_tile)  # Mark as recently used for prune_tile_cache()
+                except OSError:
+                    pass
+                return cached_tile, info['duration']
+
+        if cached_tile:
+            try:
+                cached_tile.parent.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(f"  Warning: Could not use tile cache: {e}")
+                cached_tile = None
+
+        # Encode cached tiles next to their cache entry under a unique temporary
+        # name, so an interrupted encode is never mistaken for a finished tile
+        # and concurrent runs building the same tile don't write the same file
+        if cached_tile:
+            fd, tile_path = tempfile.mkstemp(dir=cached_tile.parent, prefix=f"{cached_tile.stem}.",
+                                             suffix='.partial.mp4')
+            os.close(fd)
+            tile_path = Path(tile_path)
         else:
-            print(f"  ✗ Failed to create tile {i + 1}")
-            sys.exit(1)
+            tile_path = Path(temp_dir) / f"tile_{i}.mp4"
+
+        duration = create_tile_video(videos, trans_type, trans_duration, tile_path, tile_width, tile_height,
+                                     crop_mode, crop_position, threads=encoder_threads, video_args=tile_video_args,
+                                     include_audio=include_audio)
+
+        if cached_tile and duration is not None:
+            os.replace(tile_path, cached_tile)
+            tile_path = cached_tile
+        elif cached_tile:
+            tile_path.unlink(missing_ok=True)
+        return tile_path, duration
+
+    # Report tiles as they finish, and stop queueing work as soon as one fails
+    tile_results = [None] * len(tile_settings)
+
+    def encode_tiles(indices):
+        with ThreadPoolExecutor(max_workers=tile_jobs) as executor:
+            futures = {executor.submit(encode_tile, i, tile_settings[i]): i for i in indices}
+            for future in as_completed(futures):
+                i = futures[future]
+                tile_path, duration = future.result()
+                if duration is None:
+                    print(f"  ✗ Failed to create tile {i + 1}")
+                    executor.shutdown(cancel_futures=True)
+                    sys.exit(1)
+                print(f"  ✓ Tile {i + 1} created ({duration:.2f}s)")
+                tile_results[i] = (tile_path, duration)
+        if not args.no_cache:
+            prune_tile_cache(keep=[result[0] for result in tile_results if result])
+
+    # Build, loop and stack every tile in one encode instead of encoding each
+    # tile to disk and decoding it again. Compositions with too many clips
+    # encode their biggest tiles first and fuse the rest into the final pass
+    single_pass_cmd = build_single_pass_command(layout_code, tile_settings, crop_mode, audio_tile, args.width, args.height,
+                                                video_args, temp_dir)
+    if not single_pass_cmd:
+        prebuilt_tiles = choose_tiles_to_encode(tile_settings, temp_dir)
+        if prebuilt_tiles:
+            print(f"\nEncoding {len(prebuilt_tiles)} of {len(tile_settings)} tiles ahead of the single pass...")
+            encode_tiles(prebuilt_tiles)
+            single_pass_cmd = build_single_pass_command(layout_code, tile_settings, crop_mode, audio_tile,
+                                                        args.width, args.height, video_args, temp_dir,
+                                                        {i: tile_results[i] for i in prebuilt_tiles})
+    if single_pass_cmd:
+        print("\nBuilding all tiles in a single ffmpeg pass...")
+        single_pass_cmd.append(str(output_path))
+        try:
+            subprocess.run(single_pass_cmd, check=True)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            print_output_info(output_path)
+            print("\n" + "=" * 60)
+            print("Done!")
+            print("=" * 60)
+            return
+        except subprocess.CalledProcessError as e:
+            print(f"\n⚠ Single-pass encode failed ({e}), encoding tiles one by one instead")
+
+    # Tiles already encoded for the single pass are re-used
+    encode_tiles([i for i, result in enumerate(tile_results) if result is None])
+
+    tile_paths = [tile_path for tile_path, _ in tile_results]
+    tile_durations = [duration for _, duration in tile_results]
 
     # Find max duration and loop shorter tiles
     max_duration = max(tile_durations)
     print(f"\nLongest tile: {max_duration:.2f}s")
 
-    for i, (tile_path, duration) in enumerate(zip(tile_paths, tile_durations)):
+    # Shorter tiles are looped by the final encode itself (-stream_loop on their input)
+    for i, duration in enumerate(tile_durations):
         if duration < max_duration - 0.1:  # If significantly shorter
-            print(f"Looping tile {i + 1} ({duration:.2f}s -> {max_duration:.2f}s)...")
-
-            # Create a looped version
-            looped_tile = Path(temp_dir) / f"tile_{i}_looped.mp4"
-
-            # Calculate how many times to repeat the input
-            loops_needed = int(max_duration / duration) + 1
-
-            # Build concat file
-            concat_file = Path(temp_dir) / f"tile_{i}_concat.txt"
-            with open(concat_file, 'w') as f:
-                for _ in range(loops_needed):
-                    escaped_path = str(tile_path.absolute()).replace("'", "'\\''")
-                    f.write(f"file '{escaped_path}'\n")
-
-            # Concat and trim to exact duration
-            try:
-                cmd = [
-                    'ffmpeg',
-                    '-f', 'concat',
-                    '-safe', '0',
-                    '-i', str(concat_file),
-                    '-t', str(max_duration),
-                    '-c', 'copy',
-                    '-y',
-                    str(looped_tile)
-                ]
-                subprocess.run(cmd, capture_output=True, check=True)
-
-                # Replace original with looped version
-                tile_path.unlink()
-                looped_tile.rename(tile_path)
-                concat_file.unlink()
-
-                print(f"  ✓ Tile {i + 1} looped successfully")
-            except subprocess.CalledProcessError as e:
-                print(f"  ✗ Error looping tile {i + 1}: {e}")
-                sys.exit(1)
+            print(f"Looping tile {i + 1} ({duration:.2f}s -> {max_duration:.2f}s)")
 
     # Create final tiled composition
     print("\nCombining tiles into final output...")
-    output_path = Path(args.output)
 
-    cmd = build_xstack_layout(layout_code, tile_paths, audio_tile, args.width, args.height)
+    cmd = build_xstack_layout(layout_code, tile_paths, audio_tile, args.width, args.height, video_args,
+                              tile_durations)
     cmd.append(str(output_path))
 
     try:
         subprocess.run(cmd, check=True)
-        print(f"\n✓ Successfully created: {output_path.absolute()}")
-
-        # Get output info
-        info = get_video_info(output_path)
-        if info:
-            print(f"  Duration: {info['duration']:.2f}s")
-            print(f"  Resolution: {info['width']}x{info['height']}")
+        print_output_info(output_path)
     except subprocess.CalledProcessError as e:
         print(f"\n✗ Error creating tiled video: {e}")
         sys.exit(1)
     finally:
-        # Cleanup temp files
-        for tile_path in tile_paths:
-            if tile_path.exists():
-                tile_path.unlink()
-        os.rmdir(temp_dir)
+        # Cleanup temp files (cached tiles live outside temp_dir and stay for later runs)
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
     print("\n" + "=" * 60)
     print("Done!")
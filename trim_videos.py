@@ -6,49 +6,72 @@ Trims videos in specified folders with custom start/end trim values per folder.
 
 import os
 import sys
+import json
 import argparse
+import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Default source folder for videos
-SRC_FOLDER = Path('src')
+from _videotiling_utils import (HW_ENCODER_ARGS, NVENC_MAX_SESSIONS, SRC_FOLDER, available_cpus, detect_hw_encoder,
+                                resolve_folder_path)
 
 # Common video file extensions
-VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm'}
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.m4v', '.webm')
 
-def resolve_folder_path(folder_input):
-    """Resolve folder path, prepending src/ if it's a relative name."""
-    folder_path = Path(folder_input)
+# Software x264 settings, used when no hardware encoder is picked
+SOFTWARE_ENCODER_ARGS = ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23']
 
-    # If it's an absolute path or starts with ./ or ../, use as-is
-    if folder_path.is_absolute() or str(folder_input).startswith(('./', '../')):
-        return folder_path
-
-    # Otherwise, check if it exists in src/ folder
-    src_path = SRC_FOLDER / folder_input
-    if src_path.exists():
-        return src_path
-
-    # If neither exists, return the src path (will show error later)
-    if not folder_path.exists():
-        return src_path
-
-    # Original path exists, use it
-    return folder_path
+# Probed durations from earlier runs, keyed by path, mtime and size
+DURATION_CACHE_FILE = Path.home() / '.cache' / 'video-tiling' / 'durations.json'
 
 def get_video_files(folder_path):
     """Get all video files in the specified folder."""
     folder = Path(folder_path)
-    if not folder.exists():
+
+    # scandir gets the file type from the directory listing - no stat per entry,
+    # and a missing folder shows up as an error instead of needing an exists() check
+    try:
+        with os.scandir(folder) as entries:
+            video_files = [Path(entry.path) for entry in entries
+                           if entry.name.lower().endswith(VIDEO_EXTENSIONS) and entry.is_file()]
+    except FileNotFoundError:
         print(f"Error: Folder '{folder_path}' does not exist.")
         return []
-
-    video_files = [f for f in folder.iterdir()
-                   if f.is_file() and f.suffix.lower() in VIDEO_EXTENSIONS]
     return sorted(video_files)
 
-def get_video_duration(video_path):
-    """Get the duration of a video in seconds using ffprobe."""
+def load_duration_cache():
+    """Load the {key: duration} cache of earlier probes, or an empty dict."""
+    try:
+        with open(DURATION_CACHE_FILE) as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_duration_cache(cache):
+    """Write the duration cache back so unchanged videos skip ffprobe next time."""
+    try:
+        DURATION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = DURATION_CACHE_FILE.with_suffix('.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(cache, f)
+        os.replace(temp_path, DURATION_CACHE_FILE)
+    except OSError as e:
+        print(f"Warning: Could not save duration cache: {e}")
+
+def get_video_duration(video_path, cache=None):
+    """Get the duration of a video in seconds using ffprobe (or the cache, if given)."""
+    key = None
+    if cache is not None:
+        try:
+            stat = os.stat(video_path)
+            key = f"{Path(video_path).resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            pass
+        if key in cache:
+            return cache[key]
+
     try:
         cmd = [
             'ffprobe',
@@ -58,53 +81,102 @@ def get_video_duration(video_path):
             str(video_path)
         ]
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
+        duration = float(result.stdout.strip())
+        if key:
+            cache[key] = duration
+        return duration
     except (subprocess.CalledProcessError, ValueError) as e:
         print(f"Warning: Could not determine duration for {video_path.name}")
         return None
 
-def trim_video(input_path, output_path, trim_start, trim_end):
-    """Trim a video using ffmpeg."""
-    duration = get_video_duration(input_path)
-
-    if duration is None:
-        print(f"Skipping {input_path.name} (could not determine duration)")
-        return False
-
-    # Calculate the new duration
-    new_duration = duration - trim_start - trim_end
-
-    if new_duration <= 0:
-        print(f"Skipping {input_path.name} (trim values exceed video duration)")
-        return False
-
-    print(f"  Trimming {input_path.name} ({duration:.2f}s -> {new_duration:.2f}s)...")
+def is_empty_video(video_path):
+    """Check whether an encoded video came out empty (no bytes or no duration)."""
+    try:
+        if os.path.getsize(video_path) == 0:
+            return True
+    except OSError:
+        return True
+    return not get_video_duration(video_path)
+
+def trim_video(input_path, output_path, trim_start, trim_end, duration_cache=None, threads=None, fast=False,
+               video_args=SOFTWARE_ENCODER_ARGS):
+    """Trim a video using ffmpeg.
+
+    threads caps ffmpeg's thread count, for when several videos are trimmed at once.
+    fast stream-copies instead of re-encoding, so the cuts snap to keyframes.
+    video_args picks the video encoder and its quality settings.
+    """
+    if trim_end > 0:
+        # The end point is relative to the end of the video, so the duration is needed
+        duration = get_video_duration(input_path, duration_cache)
+
+        if duration is None:
+            print(f"Skipping {input_path.name} (could not determine duration)")
+            return False
+
+        # Calculate the new duration
+        new_duration = duration - trim_start - trim_end
+
+        if new_duration <= 0:
+            print(f"Skipping {input_path.name} (trim values exceed video duration)")
+            return False
+
+        status = f"  Trimming {input_path.name} ({duration:.2f}s -> {new_duration:.2f}s)..."
+        duration_args = ['-t', str(new_duration)]
+    else:
+        # Trimming the start only - ffmpeg runs to the end by itself, no probe needed
+        status = f"  Trimming {input_path.name} (first {trim_start:.2f}s)..."
+        duration_args = []
 
     # Build ffmpeg command
-    cmd = [
-        'ffmpeg',
-        '-i', str(input_path),
-        '-ss', str(trim_start),
-        '-t', str(new_duration),
-        '-c:v', 'libx264',  # Re-encode video
-        '-preset', 'medium',  # Encoding speed/quality balance
-        '-crf', '23',  # Quality (lower = better, 23 is good default)
-        '-c:a', 'aac',  # Re-encode audio
-        '-b:a', '192k',  # Audio bitrate
-        '-y',  # Overwrite output file if it exists
-        str(output_path)
-    ]
+    if fast:
+        cmd = [
+            'ffmpeg',
+            '-ss', str(trim_start),  # Input seek - jumps to the keyframe at or before trim_start
+            '-i', str(input_path),
+            *duration_args,
+            '-c', 'copy',  # Remux only, no decode or encode
+            '-avoid_negative_ts', 'make_zero',
+            '-y',
+            str(output_path)
+        ]
+    else:
+        cmd = [
+            'ffmpeg',
+            '-i', str(input_path),
+            '-ss', str(trim_start),
+            *duration_args,
+            *video_args,  # Re-encode video (libx264 -crf 23 or a hardware equivalent)
+            '-c:a', 'aac',  # Re-encode audio
+            '-b:a', '192k',  # Audio bitrate
+            '-y',  # Overwrite output file if it exists
+            str(output_path)
+        ]
+    if threads and not fast:
+        # Insert before the output path so it applies to the encoder
+        cmd[-1:-1] = ['-threads', str(threads)]
 
     try:
         subprocess.run(cmd, capture_output=True, check=True)
-        print(f"  ✓ Saved to {output_path}")
-        return True
+        # The start-only path never probed the input, so a trim_start past the
+        # end only shows up now, as an empty output
+        if trim_end == 0 and is_empty_video(output_path):
+            output_path.unlink(missing_ok=True)
+            sys.stdout.write(f"Skipping {input_path.name} (trim values exceed video duration)\n")
+            return False
+        result = f"  ✓ Saved to {output_path}"
+        success = True
     except subprocess.CalledProcessError as e:
-        print(f"  ✗ Error trimming {input_path.name}: {e}")
-        return False
+        result = f"  ✗ Error trimming {input_path.name}: {e}"
+        success = False
 
-def process_folder(folder_path, trim_start, trim_end, output_dir):
-    """Process all videos in a folder with specified trim values."""
+    # One write per video, so parallel trims don't interleave their lines
+    sys.stdout.write(f"{status}\n{result}\n")
+    return success
+
+def process_folder(folder_path, trim_start, trim_end, output_dir, duration_cache=None, jobs=1, fast=False,
+                   video_args=SOFTWARE_ENCODER_ARGS):
+    """Process all videos in a folder with specified trim values, trimming up to jobs videos at once."""
     video_files = get_video_files(folder_path)
 
     if not video_files:
@@ -119,11 +191,20 @@ def process_folder(folder_path, trim_start, trim_end, output_dir):
     output_folder = output_dir / folder_name
     output_folder.mkdir(parents=True, exist_ok=True)
 
-    success_count = 0
-    for video_file in video_files:
-        output_path = output_folder / video_file.name
-        if trim_video(video_file, output_path, trim_start, trim_end):
-            success_count += 1
+    # Each trim is its own ffmpeg process; split the CPUs between the ones
+    # running at once so they don't oversubscribe the machine
+    jobs = max(1, min(jobs, len(video_files)))
+    threads = max(1, available_cpus() // jobs) if jobs > 1 else None
+
+    def trim(video_file):
+        return trim_video(video_file, output_folder / video_file.name, trim_start, trim_end, duration_cache, threads,
+                          fast, video_args)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        success_count = sum(executor.map(trim, video_files))
+
+    if duration_cache is not None:
+        save_duration_cache(duration_cache)
 
     print(f"\nCompleted: {success_count}/{len(video_files)} videos trimmed successfully")
 
@@ -163,20 +244,25 @@ def main():
 Examples:
   %(prog)s folder1 folder2 folder3
   %(prog)s /path/to/videos --output /path/to/output
+  %(prog)s folder1 --jobs 4
+  %(prog)s folder1 --fast
         '''
     )
 
     parser.add_argument('folders', nargs='+', help='One or more folders containing videos to trim')
     parser.add_argument('-o', '--output', default='trimmed_output',
                         help='Output directory for trimmed videos (default: trimmed_output)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of videos to trim in parallel (default: 1)')
+    parser.add_argument('--fast', action='store_true',
+                        help='Stream-copy instead of re-encoding (much faster, but cuts snap to keyframes)')
+    parser.add_argument('--encoder', choices=['auto', 'libx264', *HW_ENCODER_ARGS], default='auto',
+                        help='Video encoder (default: auto - hardware encoder if available, else libx264)')
 
     args = parser.parse_args()
 
-    # Check if ffmpeg and ffprobe are available
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        subprocess.run(['ffprobe', '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Check if ffmpeg and ffprobe are available (a PATH lookup, no process spawned)
+    if not (shutil.which('ffmpeg') and shutil.which('ffprobe')):
         print("Error: ffmpeg and ffprobe must be installed.")
         print("Install with: brew install ffmpeg  (on macOS)")
         sys.exit(1)
@@ -186,12 +272,29 @@ Examples:
 
     print(f"Video Trimming Tool")
     print(f"Output directory: {output_dir.absolute()}")
+    video_args = SOFTWARE_ENCODER_ARGS
+    jobs = args.jobs
+    if args.fast:
+        print("⚠ Fast mode: stream copy, cuts snap to keyframes (re-encode for frame-accurate trims)")
+    else:
+        # Pick the video encoder once for every trim in this run
+        encoder = detect_hw_encoder() if args.encoder == 'auto' else args.encoder
+        if encoder in HW_ENCODER_ARGS:
+            video_args = HW_ENCODER_ARGS[encoder]
+        else:
+            encoder = 'libx264'
+        if encoder == 'h264_nvenc':
+            jobs = min(jobs, NVENC_MAX_SESSIONS)
+        print(f"Video encoder: {encoder}")
     print(f"Note: Folder names without '/' are looked up in '{SRC_FOLDER}/' first\n")
 
+    duration_cache = load_duration_cache()
+
     for folder in args.folders:
         resolved_folder = resolve_folder_path(folder)
         trim_start, trim_end = get_trim_values(str(resolved_folder))
-        process_folder(str(resolved_folder), trim_start, trim_end, output_dir)
+        process_folder(str(resolved_folder), trim_start, trim_end, output_dir, duration_cache, jobs, args.fast,
+                       video_args)
 
     print(f"\n{'='*60}")
     print(f"All done! Trimmed videos saved to: {output_dir.absolute()}")